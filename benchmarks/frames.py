@@ -0,0 +1,86 @@
+"""Measures how many websocket frames per second are decoded with the
+standard library compared to :mod:`dlive.codec`.
+
+Usage::
+
+    python benchmarks/frames.py [recorded_frames.txt]
+
+The optional file holds one recorded frame per line, as received from
+the websocket (a ``raw_data`` listener writing ``json.dumps(data)`` is
+enough to record one). Without it, chat frames shaped like the ones the
+bot subscribes to are generated.
+"""
+import json
+import os
+import sys
+import time
+
+# Run from a checkout without installing the package.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dlive import codec  # noqa: E402
+
+
+def generate_frames(count=20000):
+    frames = []
+    for index in range(count):
+        frames.append(json.dumps({
+            "id": "channel",
+            "type": "data",
+            "payload": {
+                "data": {
+                    "streamMessageReceived": [{
+                        "type": "Message",
+                        "id": str(index),
+                        "content": f"message number {index} with some text",
+                        "createdAt": "1600000000000000000",
+                        "subscribing": False,
+                        "role": "None",
+                        "roomRole": "Member",
+                        "sender": {
+                            "id": f"user:{index % 500}",
+                            "username": f"user{index % 500}",
+                            "displayname": f"User{index % 500}",
+                            "avatar": "https://images.prd.dlivecdn.com/avatar/default.png",
+                            "partnerStatus": "NONE",
+                        },
+                    }],
+                },
+            },
+        }))
+
+    return frames
+
+
+def frames_per_second(decode, frames, rounds=5):
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for frame in frames:
+            decode(frame)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return len(frames) / best
+
+
+def main():
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], "rb") as fh:
+            raw = [line.rstrip(b"\n") for line in fh if line.strip()]
+    else:
+        raw = [frame.encode() for frame in generate_frames()]
+
+    text = [frame.decode() for frame in raw]
+
+    before = frames_per_second(json.loads, text)
+    after = frames_per_second(codec.loads, raw)
+
+    print(f"frames:            {len(raw)}")
+    print(f"json.loads (str):  {before:,.0f} frames/s")
+    print(f"{codec.name}.loads (bytes): {after:,.0f} frames/s")
+    print(f"speedup:           {after / before:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,15 @@ from . import backoff
 from .command import Command
 from .enums import *
 from .errors import *
+from . import filters
+from . import gateway
+from . import history
+from . import moderation
+from . import options
+from . import redundant
+from . import runner
+from . import sender
+from . import shard
 from . import stringparser
 from . import websocket
 from . import models
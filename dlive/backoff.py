@@ -53,4 +53,9 @@ class ExponentialBackoff:
 
         self._exp = min(self._exp + 1, self._max)
 
-        return self._randfunc(0, self._base * 2 ** self._exp)
\ No newline at end of file
+        return self._randfunc(0, self._base * 2 ** self._exp)
+
+    def reset(self):
+        """Resets the exponent, so the next delay is short again.
+        Call it once an attempt succeeded."""
+        self._exp = 0
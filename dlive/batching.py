@@ -0,0 +1,100 @@
+import asyncio
+from json import dumps
+
+from .options import DEFAULTS
+
+
+class QueryBatcher:
+    """Collects ``userByDisplayName`` lookups and sends them as
+    a single aliased GraphQL query.
+
+    Lookups are gathered for ``window`` seconds, or until ``max_size``
+    of them are pending, then sent together. Identical lookups that are
+    pending or in flight share one result.
+
+    Parameters
+    ----------
+    send:
+        Coroutine function taking the query json and returning the
+        response data
+    selections: :class:`dict`
+        The selection set to request for each kind of lookup
+    window: :class:`float`
+        How long, in seconds, to collect lookups before sending them
+    max_size: :class:`int`
+        The most lookups to send in one query
+    loop: asyncio.BaseEventLoop [Optional]
+        The asyncio event loop to use
+    """
+
+    def __init__(self, send, selections, *, window=DEFAULTS["batch_window"], max_size=DEFAULTS["batch_max_size"],
+                 loop=None):
+        self._send = send
+        self._selections = selections
+        self.window = window
+        self.max_size = max_size
+        self.loop = loop or asyncio.get_event_loop()
+        self._pending = {}
+        self._loading = {}
+        self._handle = None
+
+    async def load(self, kind: str, name: str):
+        """Looks up ``name``, returning the fields selected for ``kind``
+        or ``None`` if there is no such user."""
+        key = (kind, name.lower())
+
+        try:
+            future = self._loading[key]
+        except KeyError:
+            future = self._loading[key] = self.loop.create_future()
+            future.add_done_callback(self._retrieve)
+            self._pending[key] = (name, future)
+
+            if len(self._pending) >= self.max_size:
+                self._flush()
+            elif self._handle is None:
+                self._handle = self.loop.call_later(self.window, self._flush)
+
+        return await asyncio.shield(future)
+
+    @staticmethod
+    def _retrieve(future):
+        if not future.cancelled():
+            future.exception()
+
+    def _flush(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, {}
+        self.loop.create_task(self._dispatch(batch))
+
+    async def _dispatch(self, batch):
+        aliases = {}
+        fields = []
+        for index, (key, (name, future)) in enumerate(batch.items()):
+            alias = f"b{index}"
+            aliases[alias] = (key, future)
+            fields.append(f"{alias}: userByDisplayName(displayname: {dumps(name)}){{{self._selections[key[0]]}}}")
+
+        try:
+            data = await self._send({"query": "query{" + " ".join(fields) + "}"})
+        except Exception as exc:
+            for key, future in aliases.values():
+                if not future.done():
+                    future.set_exception(exc)
+        else:
+            data = data or {}
+            for alias, (key, future) in aliases.items():
+                if not future.done():
+                    future.set_result(data.get(alias))
+        finally:
+            for key, future in aliases.values():
+                if self._loading.get(key) is future:
+                    del self._loading[key]
+                if not future.done():
+                    future.cancel()
@@ -7,7 +7,10 @@ from .command import Command
 from .errors import CommandError
 from .http import HTTPSession
 from .stringparser import StringParser
-from .websocket import WebsocketConnection
+from .shard import ShardManager
+from .options import DEFAULTS, check_options
+
+EVENT_HANDLERS = frozenset({"message"})
 
 
 class Bot:
@@ -21,31 +24,165 @@ class Bot:
         The initial channels for the bot to connect to
     loop: asyncio.BaseEventLoop [Optional]
         The asyncio event loop to use
+    chat_refresh_interval: Optional[:class:`float`]
+        How often, in seconds, the cached chats are re-fetched
+        to update counters such as followers. Defaults to ``None``
+        which never re-fetches them
+    user_cache_size: Optional[:class:`int`]
+        The most users to keep cached. Defaults to ``1000``
+    user_cache_ttl: Optional[:class:`float`]
+        How long, in seconds, a user stays cached. Defaults to ``300``
+    user_cache_negative_ttl: Optional[:class:`float`]
+        How long, in seconds, a name that doesn't exist stays
+        cached. Defaults to ``30``
+    batch_window: Optional[:class:`float`]
+        How long, in seconds, user and chat lookups are collected
+        before being sent together as one query. Defaults to ``0.002``
+    batch_max_size: Optional[:class:`int`]
+        The most lookups to send in one query. Defaults to ``50``
+    max_concurrency: Optional[:class:`int`]
+        The most events handled at the same time. Events of one
+        channel are always handled in order. Defaults to ``64``
+    queue_capacity: Optional[:class:`int`]
+        The most events waiting to be handled. ``None`` for no limit.
+        Defaults to ``10000``
+    overload_policy: Optional[:class:`~dlive.OverloadPolicy`]
+        What to do with new events once ``queue_capacity`` events
+        are waiting. Defaults to :attr:`~dlive.OverloadPolicy.block`
+    sample_rate: Optional[:class:`int`]
+        With :attr:`~dlive.OverloadPolicy.sample`, keep one in every
+        this many events while the queue is full. Defaults to ``10``
+    undroppable_events: Optional[Iterable[:class:`str`]]
+        The chat event types that are never dropped, including the ones
+        updating cached chats. Defaults to
+        ``("Ban", "Timeout", "Delete", "ChatMode", "Live", "Offline")``
+    event_priorities: Optional[:class:`dict`]
+        Maps chat event types, and ``"raw_data"``, to the
+        :class:`~dlive.EventPriority` they are handled with. Moderation
+        and stream state events default to high, ``raw_data`` to low
+        and every other event to normal
+    starvation_limit: Optional[:class:`int`]
+        How many times in a row lower priority events can be passed
+        over for higher priority ones. Defaults to ``16``
+    shard_count: Optional[:class:`int`]
+        The amount of websocket connections the channels are spread
+        across. Defaults to ``1``
+    shard_strategy: Optional[:class:`str`]
+        ``"count"`` to spread channels evenly in the order they are
+        given, or ``"hash"`` to place them by consistent hashing.
+        Defaults to ``"count"``
+    gateway: Optional[:class:`str`]
+        The address of a :class:`~dlive.gateway.Gateway`, as
+        ``tcp://host:port`` or ``unix:///path``, to receive chat events
+        from instead of subscribing to DLive. Defaults to ``None``
+    redundant: Optional[:class:`bool`]
+        Keep a standby websocket subscribed to the same channels for
+        every shard, so no event is lost while reconnecting. Events are
+        deduplicated by id, or paired across the websockets for events
+        without one. Defaults to ``False``
+    dedupe_size: Optional[:class:`int`]
+        How many recent event ids a redundant shard remembers to
+        deduplicate events. Defaults to ``10000``
+    pair_window: Optional[:class:`float`]
+        How long, in seconds, a redundant shard waits for the copy of an
+        event without an id from its other websocket. Defaults to ``2``
+    send_rate: Optional[:class:`float`]
+        The most chat messages sent every second across every chat,
+        on top of each chat's interval. ``None`` for no limit.
+        Defaults to ``5``
+    send_coalesce: Optional[:class:`bool`]
+        Join the messages waiting to be sent to the same chat into as
+        few messages as the length limit allows. Defaults to ``False``
+    moderation_window: Optional[:class:`float`]
+        How long, in seconds, bans, timeouts and message deletions are
+        collected before being sent. Identical ones are sent once and a
+        ban drops the pending deletions and timeouts of that user.
+        Defaults to ``0.005``
+    batch_mutations: Optional[:class:`bool`]
+        Send the collected moderation actions as one array of operations
+        per request. Falls back to concurrent requests if the endpoint
+        rejects arrays. Defaults to ``False``
+    moderation_concurrency: Optional[:class:`int`]
+        The most moderation requests in flight when not batching.
+        Defaults to ``8``
+    message_history_size: Optional[:class:`int`]
+        The most recent messages kept in each chat's
+        :attr:`~dlive.models.Chat.history`, used by
+        :meth:`~dlive.models.Chat.purge` and ``message_delete``.
+        ``0`` to keep none. Defaults to ``200``
+    join_concurrency: Optional[:class:`int`]
+        The most channels of a shard validated at the same time when
+        joining. ``channel_joined`` is dispatched with the chat of each
+        channel once subscribed to it. Defaults to ``50``
+    stall_timeout: Optional[:class:`float`]
+        How long, in seconds, a websocket can go without receiving any
+        frame before it is reconnected and ``connection_stalled`` is
+        dispatched with the shard id and the silence. Defaults to ``None``,
+        three times the measured keepalive interval. ``0`` disables it
+    raw_only: Optional[:class:`bool`]
+        Only dispatch ``raw_data``, skipping building models and every
+        other chat event. Defaults to ``False``
+
+    Every option's default is listed in :data:`dlive.options.DEFAULTS`.
+
+    Raises
+    ------
+    TypeError:
+        An option isn't a known one, usually because it is misspelled
+
+    Attributes
+    ----------
+    shard_manager: :class:`~dlive.shard.ShardManager`
+        The manager of the bot's websocket connections, see
+        :meth:`~dlive.shard.ShardManager.health` for their state
+    ipc: Optional[:class:`~dlive.runner.IPCChannel`]
+        The link to the other processes when the bot is run
+        by a :class:`~dlive.runner.ProcessRunner`
+    chats: :class:`dict`
+        The cached :class:`~dlive.models.Chat` of every joined channel,
+        keyed by the lowercase channel name. These are kept up to date
+        from the chat events
     """
 
-    def __init__(self, command_prefix: Union[list, tuple, str], channels: list, loop: asyncio.BaseEventLoop = None):
+    def __init__(self, command_prefix: Union[list, tuple, str], channels: list, loop: asyncio.BaseEventLoop = None, **options):
+        check_options(options)
         self.command_prefix = self.set_prefix(command_prefix)
         self.channels = channels
         self.loop = loop or asyncio.get_event_loop()
-        self._ws = WebsocketConnection(bot=self, loop=self.loop)
+        self.shard_manager = ShardManager(self, loop=self.loop, **options)
         self.commands = {}
+        self.chats = {}
+        self.ipc = None
+        # Coroutines of subclasses are event handlers, Bot's own API
+        # methods such as get_user or command_error are not.
+        self._handlers = {
+            name for name, value in inspect.getmembers(type(self))
+            if not name.startswith("_") and inspect.iscoroutinefunction(value)
+            and (name in EVENT_HANDLERS or name not in vars(Bot))}
+        self._listeners = {}
+        self._compile_listeners()
         self._aliases = {}
-        self.http = HTTPSession(self.loop, self)
+        self._chat_refresh_interval = options.get("chat_refresh_interval", DEFAULTS["chat_refresh_interval"])
+        self._message_history_size = options.get("message_history_size", DEFAULTS["message_history_size"])
+        self.http = HTTPSession(self.loop, self, **options)
 
-    async def get_user(self, username):
+    async def get_user(self, username, *, partial: bool = False):
         """Returns a user based on the given username.
 
         Parameters
         -----------
         username: :class:`str`
             The user's unique name.
+        partial: :class:`bool`
+            Whether a cached :class:`~dlive.models.PartialUser`, as seen
+            in chat, may be returned instead of fetching the full user.
 
         Returns
         -------
-        Optional[:class:`~dlive.models.User`]
+        Optional[Union[:class:`~dlive.models.User`, :class:`~dlive.models.PartialUser`]]
             The user or ``None`` if not found.
         """
-        return await self.http.get_user(username)
+        return await self.http.get_user(username, partial=partial)
 
     async def get_chat(self, username):
         """Returns a chat based on the given name (Owner's username).
@@ -62,6 +199,38 @@ class Bot:
         """
         return await self.http.get_chat(username)
 
+    async def _get_cached_chat(self, name):
+        """Returns the cached chat of a channel, fetching
+        and caching it if it isn't cached yet."""
+        key = name.lower()
+        try:
+            return self.chats[key]
+        except KeyError:
+            pass
+
+        chat = await self.http.get_chat(name)
+        if chat is not None:
+            self.chats[key] = chat
+
+        return chat
+
+    async def _refresh_chat(self, chat):
+        data = await self.http.get_chat_data(chat.name)
+        if data is not None:
+            chat._update(data)
+
+    async def _refresh_chats(self):
+        while True:
+            await asyncio.sleep(self._chat_refresh_interval)
+            # Refreshed together, so their lookups are batched.
+            await asyncio.gather(*(self._try_refresh_chat(chat) for chat in list(self.chats.values())))
+
+    async def _try_refresh_chat(self, chat):
+        try:
+            await self._refresh_chat(chat)
+        except Exception:
+            await self.error()
+
     def run(self, token=""):
         """Main blocking call that starts the bot.
 
@@ -74,12 +243,48 @@ class Bot:
             self.token = token
             loop = self.loop or asyncio.get_event_loop()
 
-            loop.run_until_complete(self._ws._connect())
-            loop.run_until_complete(self._ws._websocket_listen())
+            loop.run_until_complete(self.shard_manager._connect())
+            if self._chat_refresh_interval:
+                loop.create_task(self._refresh_chats())
+            loop.run_until_complete(self.shard_manager._websocket_listen())
         except KeyboardInterrupt:
             pass
         finally:
-            self._ws.teardown()
+            self.http.send_queue.close()
+            self.shard_manager.teardown()
+
+    async def join(self, channel: str):
+        """Joins a channel while the bot is running, without reconnecting.
+
+        Dispatches ``channel_joined`` with the channel's chat
+        once subscribed to it.
+
+        Parameters
+        ----------
+        channel: :class:`str`
+            The channels name
+
+        Returns
+        -------
+        Optional[:class:`~dlive.models.Chat`]
+            The joined chat or ``None`` if the channel doesn't exist.
+        """
+        chat = await self.shard_manager.join(channel)
+        if chat is not None and all(joined.lower() != channel.lower() for joined in self.channels):
+            self.channels.append(channel)
+
+        return chat
+
+    async def leave(self, channel: str):
+        """Leaves a channel while the bot is running, without reconnecting.
+
+        Parameters
+        ----------
+        channel: :class:`str`
+            The channels name
+        """
+        await self.shard_manager.leave(channel)
+        self.channels[:] = [joined for joined in self.channels if joined.lower() != channel.lower()]
 
     def set_prefix(self, command_prefix):
         """Sets the bots prefix.
@@ -95,6 +300,62 @@ class Bot:
         if isinstance(command_prefix, str):
             return [command_prefix]
 
+    def register_decoder(self, type: str, decoder, events=None):
+        """Registers the decoder of a stream message type, replacing
+        the current one if there is any.
+
+        Parameters
+        ----------
+        type: :class:`str`
+            The ``type`` of the stream messages to decode
+        decoder:
+            Coroutine called with the websocket connection, the channel
+            and the stream message. It should dispatch the matching
+            event and may return a :class:`~dlive.models.Message`
+        events: Optional[Iterable[:class:`str`]]
+            The events the decoder dispatches, it is skipped when none
+            of them have a listener. ``None`` to always run it
+
+        Raises
+        ------
+        TypeError:
+            The decoder is not a coroutine
+        """
+        if not inspect.iscoroutinefunction(decoder):
+            raise TypeError("Decoders must be coroutines.")
+
+        self.shard_manager.register_decoder(type, decoder, events)
+
+    def add_filter(self, predicate, name: str = None):
+        """Adds a cheap check run on every raw stream message, in the
+        order they were added, before it is decoded.
+
+        Parameters
+        ----------
+        predicate:
+            Function called with the channel and the raw stream
+            message, returning whether to keep it. It must not be
+            a coroutine
+        name: Optional[:class:`str`]
+            The filters name, defaults to the predicate's name
+
+        Returns
+        -------
+        :class:`~dlive.filters.FrameFilter`
+            The added filter, holding how many messages it dropped
+        """
+        return self.shard_manager.add_filter(predicate, name)
+
+    def remove_filter(self, frame_filter):
+        """Removes a filter added with :meth:`add_filter`.
+
+        Parameters
+        ----------
+        frame_filter: :class:`~dlive.filters.FrameFilter`
+            The filter to remove
+        """
+        self.shard_manager.remove_filter(frame_filter)
+
     def listener(self, coroutine):
         """Adds a listener to the bot, that is called
         when a specific event occurs.
@@ -113,9 +374,81 @@ class Bot:
             raise TypeError("Listeners must be coroutines.")
 
         setattr(self, coroutine.__name__, coroutine)
-        
+        self._handlers.add(coroutine.__name__)
+        self._compile_listeners()
+
         return coroutine
 
+    def add_listener(self, coroutine, name: str = None):
+        """Adds a listener to the bot, called alongside
+        the other listeners of the event.
+
+        Parameters
+        ----------
+        coroutine:
+            coroutine
+        name: Optional[:class:`str`]
+            The event to listen to, defaults to the coroutine's name
+
+        Raises
+        ------
+        TypeError:
+            The function is not a coroutine
+        """
+        if not inspect.iscoroutinefunction(coroutine):
+            raise TypeError("Listeners must be coroutines.")
+
+        self._listeners.setdefault(name or coroutine.__name__, []).append(coroutine)
+        self._compile_listeners()
+
+    def remove_listener(self, coroutine, name: str = None):
+        """Removes a listener added with :meth:`add_listener`.
+
+        Parameters
+        ----------
+        coroutine:
+            coroutine
+        name: Optional[:class:`str`]
+            The event it listens to, defaults to the coroutine's name
+        """
+        name = name or coroutine.__name__
+        try:
+            self._listeners[name].remove(coroutine)
+        except (KeyError, ValueError):
+            return
+
+        if not self._listeners[name]:
+            del self._listeners[name]
+
+        self._compile_listeners()
+
+    def listen(self, name: str = None):
+        """Decorator that adds a listener to the bot, unlike
+        :meth:`listener` many can be added for the same event.
+
+        Parameters
+        ----------
+        name: Optional[:class:`str`]
+            The event to listen to, defaults to the coroutine's name
+        """
+        def decorator(coroutine):
+            self.add_listener(coroutine, name)
+            return coroutine
+
+        return decorator
+
+    def _compile_listeners(self):
+        """Rebuilds the table mapping every event to its listeners."""
+        table = {}
+        for name in self._handlers:
+            table[name] = (getattr(self, name),)
+
+        for name, listeners in self._listeners.items():
+            table[name] = table.get(name, ()) + tuple(listeners)
+
+        self._dispatch_table = table
+        self._listening = frozenset(table)
+
     def add_command(self, command):
         """Adds a command.
 
@@ -171,7 +504,12 @@ class Bot:
             pass
 
     async def error(self):
-        """Default error handler."""
+        """Default error handler.
+
+        Called while handling an exception raised by a listener, by
+        processing an event or by refreshing a chat, so it can be read
+        with :func:`sys.exc_info`.
+        """
         traceback.print_exc()
 
     async def command_error(self, message, error):
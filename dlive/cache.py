@@ -0,0 +1,167 @@
+import time
+from collections import OrderedDict
+
+from .models.user import PartialUser
+from .options import DEFAULTS
+
+
+class UserCache:
+    """A bounded cache of users keyed by their lowercase username.
+
+    Entries expire after ``ttl`` seconds and the least recently used
+    entry is evicted once ``maxsize`` is reached. Names that do not
+    exist are remembered for ``negative_ttl`` seconds so they aren't
+    looked up over and over again.
+
+    Partial users seen in chat are kept in a store of their own, bounded
+    by ``partial_maxsize``, so chat traffic never evicts full users. They
+    are only returned to lookups accepting partial users.
+
+    Parameters
+    ----------
+    maxsize: :class:`int`
+        The most users to keep
+    ttl: :class:`float`
+        How long, in seconds, a user is kept
+    negative_ttl: :class:`float`
+        How long, in seconds, an unknown name is kept
+    negative_maxsize: :class:`int`
+        The most unknown names to keep
+    partial_maxsize: Optional[:class:`int`]
+        The most partial users to keep, defaults to ``maxsize``
+
+    Attributes
+    ----------
+    hits: :class:`int`
+        Amount of lookups answered from the cache
+    misses: :class:`int`
+        Amount of lookups that were not cached
+    evictions: :class:`int`
+        Amount of entries removed to stay under ``maxsize``
+    """
+
+    def __init__(self, maxsize=DEFAULTS["user_cache_size"], ttl=DEFAULTS["user_cache_ttl"], *,
+                 negative_ttl=DEFAULTS["user_cache_negative_ttl"], negative_maxsize=1000, partial_maxsize=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.negative_maxsize = negative_maxsize
+        self.partial_maxsize = partial_maxsize if partial_maxsize is not None else maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._users = OrderedDict()
+        self._missing = OrderedDict()
+        self._partials = OrderedDict()
+
+    def __len__(self):
+        return len(self._users)
+
+    def __contains__(self, username):
+        return self._lookup(self._users, username.lower()) is not None
+
+    @staticmethod
+    def _lookup(store, key):
+        try:
+            expires, value = store[key]
+        except KeyError:
+            return None
+
+        if expires < time.monotonic():
+            del store[key]
+            return None
+
+        store.move_to_end(key)
+        return (value,)
+
+    def _store(self, store, key, value, ttl, maxsize):
+        store[key] = (time.monotonic() + ttl, value)
+        store.move_to_end(key)
+
+        while len(store) > maxsize:
+            store.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, username, *, partial=False):
+        """Looks up a user.
+
+        Parameters
+        ----------
+        username: :class:`str`
+            The user's unique name
+        partial: :class:`bool`
+            Whether a :class:`~dlive.models.PartialUser` is an
+            acceptable result
+
+        Returns
+        -------
+        Optional[:class:`tuple`]
+            ``None`` on a miss, otherwise a one item tuple
+            with the user or ``None`` if the user doesn't exist.
+        """
+        key = username.lower()
+
+        found = self._lookup(self._users, key)
+        if found is None and partial:
+            found = self._lookup(self._partials, key)
+        if found is not None:
+            self.hits += 1
+            return found
+
+        if self._lookup(self._missing, key) is not None:
+            self.hits += 1
+            return (None,)
+
+        self.misses += 1
+        return None
+
+    def put(self, username, user):
+        """Caches a user, or that a name does not exist if ``user`` is ``None``."""
+        key = username.lower()
+
+        if user is None:
+            self._users.pop(key, None)
+            self._partials.pop(key, None)
+            self._store(self._missing, key, None, self.negative_ttl, self.negative_maxsize)
+        elif isinstance(user, PartialUser):
+            self.warm(user)
+        else:
+            self._missing.pop(key, None)
+            self._partials.pop(key, None)
+            self._store(self._users, key, user, self.ttl, self.maxsize)
+
+    def warm(self, user):
+        """Caches a :class:`~dlive.models.PartialUser` seen in chat,
+        unless the full user is already cached."""
+        key = user.username.lower()
+        self._missing.pop(key, None)
+
+        if key in self._users:
+            return
+
+        self._store(self._partials, key, user, self.ttl, self.partial_maxsize)
+
+    def invalidate(self, username=None):
+        """Removes a user from the cache, or every entry if no name is given."""
+        if username is None:
+            self._users.clear()
+            self._missing.clear()
+            self._partials.clear()
+            return
+
+        key = username.lower()
+        self._users.pop(key, None)
+        self._missing.pop(key, None)
+        self._partials.pop(key, None)
+
+    @property
+    def stats(self) -> dict:
+        """The hit, miss and eviction counters along with the cache size."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._users),
+            "missing": len(self._missing),
+            "partial": len(self._partials),
+        }
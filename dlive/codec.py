@@ -0,0 +1,41 @@
+"""JSON encoding and decoding of websocket frames and HTTP bodies.
+
+Uses orjson or ujson when one is installed, falling back to the
+standard library otherwise. :func:`loads` accepts both :class:`bytes`
+and :class:`str`, so raw payloads can be decoded without first being
+turned into a string.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+__all__ = ("name", "loads", "dumps")
+
+if orjson is not None:
+    name = "orjson"
+    loads = orjson.loads
+
+    def dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+
+elif ujson is not None:
+    name = "ujson"
+    loads = ujson.loads
+
+    def dumps(obj) -> str:
+        return ujson.dumps(obj, ensure_ascii=False)
+
+else:
+    name = "json"
+    loads = json.loads
+
+    def dumps(obj) -> str:
+        return json.dumps(obj, separators=(",", ":"))
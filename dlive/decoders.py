@@ -0,0 +1,129 @@
+from .models import Message, PartialUser
+from .models.events import Delete, EmoteAdd, Gift, Host, ModeChange, Subscription
+
+DECODERS = {}
+
+
+def decoder(*types, events=None):
+    """Decorator that registers a coroutine as the default decoder of
+    the given stream message types.
+
+    A decoder is called with the :class:`~dlive.websocket.WebsocketConnection`,
+    the channel and the stream message, it builds the matching model and
+    dispatches the matching event. Decoders listing the ``events`` they
+    dispatch are skipped when none of them have a listener, decoders
+    without ``events`` always run.
+    """
+    def decorator(func):
+        for type in types:
+            DECODERS[type] = (func, frozenset(events) if events is not None else None)
+
+        return func
+
+    return decorator
+
+
+@decoder("Message", events=("message", "message_batch"))
+async def decode_message(connection, channel, item):
+    bot = connection._bot
+    chat = await bot._get_cached_chat(channel)
+    # Deleted while it was still queued behind the deletion.
+    if chat is not None and chat.history.is_deleted(item["id"]):
+        return None
+
+    author = PartialUser(bot, item)
+    bot.http.user_cache.warm(author)
+    message = Message(bot=bot, data=item, chat=chat, author=author)
+    if chat is not None:
+        chat.history.append(message)
+    await connection._dispatch("message", message)
+    return message
+
+
+@decoder("Live")
+async def decode_live(connection, channel, item):
+    chat = await connection._bot._get_cached_chat(channel)
+    await connection._bot._refresh_chat(chat)
+    await connection._dispatch("stream_start", chat)
+
+
+@decoder("Offline")
+async def decode_offline(connection, channel, item):
+    chat = await connection._bot._get_cached_chat(channel)
+    chat.livestream = None
+    await connection._dispatch("stream_end", chat)
+
+
+@decoder("ChatMode")
+async def decode_chat_mode(connection, channel, item):
+    chat = await connection._bot._get_cached_chat(channel)
+    mode_change = ModeChange(connection._bot, item, chat)
+    chat.chat_mode = mode_change.mode
+    await connection._dispatch("chat_mode_change", mode_change)
+
+
+@decoder("Follow", events=("follow",))
+async def decode_follow(connection, channel, item):
+    user = await connection._bot.get_user(item["sender"]["username"])
+    chat = await connection._bot._get_cached_chat(channel)
+    await connection._dispatch("follow", chat, user)
+
+
+@decoder("Mod", events=("mod_add", "mod_remove"))
+async def decode_mod(connection, channel, item):
+    user = await connection._bot.get_user(item["sender"]["username"])
+    chat = await connection._bot._get_cached_chat(channel)
+
+    if item["roomRole"] == "Member":
+        await connection._dispatch("mod_remove", chat, user)
+
+    elif item["roomRole"] == "Moderator":
+        await connection._dispatch("mod_add", chat, user)
+
+
+@decoder("Ban", events=("ban",))
+async def decode_ban(connection, channel, item):
+    user = await connection._bot.get_user(item["sender"]["username"])
+    chat = await connection._bot._get_cached_chat(channel)
+    await connection._dispatch("ban", chat, user)
+
+
+@decoder("Timeout", events=("user_timeout",))
+async def decode_timeout(connection, channel, item):
+    user = await connection._bot.get_user(item["sender"]["username"])
+    moderator = await connection._bot.get_user(item["bannedBy"]["username"])
+    chat = await connection._bot._get_cached_chat(channel)
+    await connection._dispatch("user_timeout", chat, user, moderator, item["minute"])
+
+
+@decoder("Gift", events=("gift",))
+async def decode_gift(connection, channel, item):
+    chat = await connection._bot._get_cached_chat(channel)
+    await connection._dispatch("gift", Gift(connection._bot, item, chat))
+
+
+@decoder("Host", events=("host",))
+async def decode_host(connection, channel, item):
+    chat = await connection._bot._get_cached_chat(channel)
+    await connection._dispatch("host", Host(connection._bot, item, chat))
+
+
+@decoder("Subscription", events=("subscription",))
+async def decode_subscription(connection, channel, item):
+    chat = await connection._bot._get_cached_chat(channel)
+    await connection._dispatch("subscription", Subscription(connection._bot, item, chat))
+
+
+# Always runs, so deleted messages leave the chat's history.
+@decoder("Delete")
+async def decode_delete(connection, channel, item):
+    chat = await connection._bot._get_cached_chat(channel)
+    messages = [chat.history.delete(id) for id in item["ids"]] if chat is not None else []
+    delete = Delete(connection._bot, item, chat, [message for message in messages if message is not None])
+    await connection._dispatch("message_delete", delete)
+
+
+@decoder("Emote", events=("emote_add",))
+async def decode_emote_add(connection, channel, item):
+    chat = await connection._bot._get_cached_chat(channel)
+    await connection._dispatch("emote_add", EmoteAdd(connection._bot, item, chat))
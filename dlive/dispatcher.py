@@ -0,0 +1,287 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+
+from .enums import EventPriority, OverloadPolicy
+from .options import DEFAULTS
+
+
+class _PriorityQueue:
+    """A FIFO queue per :class:`~dlive.EventPriority`, a lower class is
+    served once it has been passed over ``starvation_limit`` times."""
+
+    def __init__(self, starvation_limit):
+        self.starvation_limit = starvation_limit
+        self._queues = [deque() for _ in EventPriority]
+        self._skipped = [0 for _ in EventPriority]
+
+    def __len__(self):
+        return sum(len(queue) for queue in self._queues)
+
+    def append(self, job, priority):
+        self._queues[priority.value - 1].append(job)
+
+    def oldest_droppable(self, priority):
+        return next((job for job in self._queues[priority.value - 1] if job[3]), None)
+
+    def remove(self, job):
+        for queue in self._queues:
+            try:
+                queue.remove(job)
+            except ValueError:
+                continue
+            return
+
+    def popleft(self):
+        pending = [index for index, queue in enumerate(self._queues) if queue]
+        if not pending:
+            raise IndexError("pop from an empty queue")
+
+        index = pending[0]
+        starved = max(pending, key=self._skipped.__getitem__)
+        if self._skipped[starved] >= self.starvation_limit:
+            index = starved
+
+        for other in pending:
+            self._skipped[other] = 0 if other == index else self._skipped[other] + 1
+
+        return self._queues[index].popleft()
+
+
+class _PrioritySemaphore:
+    """A semaphore waking waiters by priority, and the longest waiting
+    one after ``starvation_limit`` consecutive out of order wake ups."""
+
+    def __init__(self, value, starvation_limit, loop):
+        self._value = value
+        self._starvation_limit = starvation_limit
+        self._loop = loop
+        self._waiters = []
+        self._seq = itertools.count()
+        self._passed_over = 0
+
+    async def acquire(self, priority):
+        if self._value > 0 and not self._waiters:
+            self._value -= 1
+            return
+
+        future = self._loop.create_future()
+        waiter = (priority.value, next(self._seq), future)
+        heapq.heappush(self._waiters, waiter)
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+                heapq.heapify(self._waiters)
+            raise
+
+    def release(self):
+        while self._waiters:
+            waiter = self._waiters[0]
+            oldest = min(self._waiters, key=lambda item: item[1])
+
+            if oldest is not waiter and self._passed_over >= self._starvation_limit:
+                waiter = oldest
+                self._waiters.remove(waiter)
+                heapq.heapify(self._waiters)
+                self._passed_over = 0
+            else:
+                heapq.heappop(self._waiters)
+                self._passed_over = self._passed_over + 1 if oldest is not waiter else 0
+
+            if not waiter[2].done():
+                waiter[2].set_result(None)
+                return
+
+        self._value += 1
+
+
+class EventDispatcher:
+    """Runs websocket events on worker tasks so the reader never
+    waits on user code.
+
+    Events sharing a key (the channel they came from) run one after
+    another in the order they were submitted, while events of different
+    channels run concurrently, up to ``max_concurrency`` at a time.
+
+    Queued events are handled by :class:`~dlive.EventPriority`, lower
+    priorities being served after being passed over ``starvation_limit``
+    times in a row so they are never starved.
+
+    At most ``capacity`` events are queued, once full new events are
+    handled according to ``policy``. Events submitted with
+    ``droppable=False`` are never dropped.
+
+    Parameters
+    ----------
+    max_concurrency: :class:`int`
+        The most events to process at the same time
+    capacity: Optional[:class:`int`]
+        The most events to queue, ``None`` for no limit
+    policy: :class:`~dlive.OverloadPolicy`
+        What to do with new events once the queue is full
+    sample_rate: :class:`int`
+        With :attr:`~dlive.OverloadPolicy.sample`, one in every
+        this many new events is kept while the queue is full
+    on_error:
+        Coroutine function called with the exception when
+        processing an event fails
+    on_overload:
+        Function called with the queue depth and the amount of dropped
+        events when the queue is full, at most once per ``overload_interval``
+    overload_interval: :class:`float`
+        The least amount of seconds between two ``on_overload`` calls
+    starvation_limit: :class:`int`
+        How many times in a row a lower priority can be passed over
+    loop: asyncio.BaseEventLoop [Optional]
+        The asyncio event loop to use
+
+    Attributes
+    ----------
+    dropped: :class:`int`
+        Amount of events dropped because the queue was full
+    """
+
+    def __init__(self, *, max_concurrency=DEFAULTS["max_concurrency"], capacity=None, policy=DEFAULTS["overload_policy"],
+                 sample_rate=DEFAULTS["sample_rate"], on_error=None, on_overload=None, overload_interval=1.0,
+                 starvation_limit=DEFAULTS["starvation_limit"], loop=None):
+        self.loop = loop or asyncio.get_event_loop()
+        self.max_concurrency = max_concurrency
+        self.capacity = capacity
+        self.policy = policy
+        self.sample_rate = sample_rate
+        self.overload_interval = overload_interval
+        self.starvation_limit = starvation_limit
+        self.dropped = 0
+        self._on_error = on_error
+        self._on_overload = on_overload
+        self._last_overload = None
+        self._sampled = 0
+        self._size = 0
+        self._seq = itertools.count()
+        self._space = asyncio.Event()
+        self._semaphore = _PrioritySemaphore(max_concurrency, starvation_limit, self.loop)
+        self._queues = {}
+        self._workers = {}
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def is_full(self) -> bool:
+        """Whether the queue holds ``capacity`` events or more."""
+        return self.capacity is not None and self._size >= self.capacity
+
+    async def submit(self, key, func, *args, droppable=True, priority=EventPriority.normal):
+        """Queues ``func(*args)`` behind the other events of ``key``
+        with the same or a higher ``priority``.
+
+        Returns
+        -------
+        :class:`bool`
+            Whether the event was queued.
+        """
+        if self.is_full:
+            self._overloaded()
+
+            if self.policy is OverloadPolicy.block:
+                while self.is_full:
+                    self._space.clear()
+                    await self._space.wait()
+            elif not droppable:
+                self._drop_oldest()
+            elif self.policy is OverloadPolicy.drop_newest:
+                return self._drop()
+            elif self.policy is OverloadPolicy.drop_oldest:
+                if not self._drop_oldest():
+                    return self._drop()
+            elif self.policy is OverloadPolicy.sample:
+                self._sampled += 1
+                if self._sampled % self.sample_rate or not self._drop_oldest():
+                    return self._drop()
+
+        self._enqueue(key, (next(self._seq), func, args, droppable, priority), priority)
+        return True
+
+    def _enqueue(self, key, job, priority):
+        try:
+            queue = self._queues[key]
+        except KeyError:
+            queue = self._queues[key] = _PriorityQueue(self.starvation_limit)
+
+        queue.append(job, priority)
+        self._size += 1
+
+        if key not in self._workers:
+            self._workers[key] = self.loop.create_task(self._drain(key, queue))
+
+    def _drop(self):
+        self.dropped += 1
+        return False
+
+    def _drop_oldest(self):
+        """Drops the oldest droppable event of the lowest priority holding one."""
+        for priority in reversed(EventPriority):
+            oldest = None
+            for queue in self._queues.values():
+                job = queue.oldest_droppable(priority)
+                if job is not None and (oldest is None or job[0] < oldest[1][0]):
+                    oldest = (queue, job)
+
+            if oldest is not None:
+                oldest[0].remove(oldest[1])
+                self._size -= 1
+                self._drop()
+                return True
+
+        return False
+
+    def _overloaded(self):
+        if self._on_overload is None:
+            return
+
+        now = time.monotonic()
+        if self._last_overload is not None and now - self._last_overload < self.overload_interval:
+            return
+
+        self._last_overload = now
+        self._on_overload(self._size, self.dropped)
+
+    async def _drain(self, key, queue):
+        try:
+            while queue:
+                _, func, args, _, priority = queue.popleft()
+                self._size -= 1
+                if not self.is_full:
+                    self._space.set()
+
+                await self._semaphore.acquire(priority)
+                try:
+                    await func(*args)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as exc:
+                    if self._on_error is not None:
+                        await self._on_error(exc)
+                finally:
+                    self._semaphore.release()
+        finally:
+            self._workers.pop(key, None)
+            # close() may have dropped the queue already.
+            if not queue and self._queues.get(key) is queue:
+                del self._queues[key]
+
+    def close(self):
+        """Cancels every worker and drops the queued events."""
+        for worker in list(self._workers.values()):
+            worker.cancel()
+
+        self._queues.clear()
+        self._size = 0
+        self._space.set()
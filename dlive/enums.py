@@ -73,4 +73,45 @@ class TreasureChestState(Enum):
         The channel users are collecting chest rewards.
     """
     collecting = 1
-    claiming = 2
\ No newline at end of file
+    claiming = 2
+
+class OverloadPolicy(Enum):
+    """
+    What a :class:`~dlive.Bot` does with new events once its
+    event queue is full.
+
+    Attributes
+    ----------
+    block:
+        Stop reading from the websocket until there is room.
+    drop_oldest:
+        Drop the oldest queued event to make room.
+    drop_newest:
+        Drop the new event.
+    sample:
+        Keep one in every ``sample_rate`` new events, dropping
+        the oldest queued event to make room for it.
+    """
+    block = 1
+    drop_oldest = 2
+    drop_newest = 3
+    sample = 4
+
+
+class EventPriority(Enum):
+    """
+    The order in which queued events are handled, see
+    the ``event_priorities`` option of :class:`~dlive.Bot`.
+
+    Attributes
+    ----------
+    high:
+        Moderation and stream state events.
+    normal:
+        Chat messages and every other chat event.
+    low:
+        Events such as ``raw_data``.
+    """
+    high = 1
+    normal = 2
+    low = 3
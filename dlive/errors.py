@@ -1,4 +1,4 @@
-class DLivePyException(BaseException):
+class DLivePyException(Exception):
     pass
 
 
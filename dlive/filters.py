@@ -0,0 +1,78 @@
+class FrameFilter:
+    """A cheap check run on every raw stream message before it is decoded.
+
+    Filters run in the order they were added, and a stream message
+    dropped by one is neither decoded nor passed to the next filters.
+
+    Parameters
+    ----------
+    predicate:
+        Function called with the channel and the raw stream message,
+        returning whether to keep it. It must not be a coroutine
+    name: Optional[:class:`str`]
+        The filters name, defaults to the predicate's name
+
+    Attributes
+    ----------
+    checked: :class:`int`
+        Amount of stream messages the filter ran on
+    dropped: :class:`int`
+        Amount of stream messages the filter dropped
+    """
+
+    def __init__(self, predicate, name: str = None):
+        self.predicate = predicate
+        self.name = name or getattr(predicate, "__name__", type(predicate).__name__)
+        self.checked = 0
+        self.dropped = 0
+
+    def __repr__(self):
+        return f"<FrameFilter name={self.name!r} checked={self.checked} dropped={self.dropped}>"
+
+    def __call__(self, channel, item) -> bool:
+        self.checked += 1
+        if self.predicate(channel, item):
+            return True
+
+        self.dropped += 1
+        return False
+
+
+def ignore_users(*usernames):
+    """Returns a predicate dropping every stream message sent by one of
+    ``usernames``.
+
+    Parameters
+    ----------
+    usernames: :class:`str`
+        The users to ignore
+    """
+    ignored = frozenset(username.lower() for username in usernames)
+
+    def ignore_users(channel, item):
+        try:
+            return item["sender"]["username"].lower() not in ignored
+        except (KeyError, TypeError, AttributeError):
+            return True
+
+    return ignore_users
+
+
+def command_prefix(*prefixes):
+    """Returns a predicate dropping every chat message that doesn't start
+    with one of ``prefixes``. Other stream messages are kept.
+
+    Parameters
+    ----------
+    prefixes: :class:`str`
+        The prefixes to keep messages starting with
+    """
+    prefixes = tuple(prefixes)
+
+    def command_prefix(channel, item):
+        if item.get("type") != "Message":
+            return True
+
+        return item.get("content", "").startswith(prefixes)
+
+    return command_prefix
@@ -0,0 +1,286 @@
+import asyncio
+import logging
+import time
+from urllib.parse import urlparse
+
+from . import codec, errors
+from .backoff import ExponentialBackoff
+from .websocket import WebsocketConnection
+
+# The longest frame a consumer reads, larger than asyncio's 64 KiB default.
+LINE_LIMIT = 2 ** 22
+
+
+async def _open_connection(address: str):
+    url = urlparse(address)
+    if url.scheme == "unix":
+        return await asyncio.open_unix_connection(url.path, limit=LINE_LIMIT)
+    if url.scheme == "tcp":
+        return await asyncio.open_connection(url.hostname, url.port, limit=LINE_LIMIT)
+
+    raise ValueError(f"Unknown gateway address {address!r}, expected tcp://host:port or unix:///path.")
+
+
+class _Subscriber:
+    def __init__(self, writer, channels, buffer_size):
+        self.writer = writer
+        self.channels = {channel.lower() for channel in channels} if channels is not None else None
+        self.queue = asyncio.Queue(maxsize=buffer_size)
+        self.dropped = 0
+
+    def push(self, line):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+
+        self.queue.put_nowait(line)
+
+    def update(self, request):
+        """Applies a ``join`` or ``leave`` request, returning
+        the channels it joined and the ones it left."""
+        if self.channels is None:
+            return set(), set()
+
+        joined = {channel.lower() for channel in request.get("join", ())} - self.channels
+        left = {channel.lower() for channel in request.get("leave", ())} & self.channels
+        self.channels |= joined
+        self.channels -= left
+        return joined, left
+
+    async def drain(self):
+        while True:
+            self.writer.write(await self.queue.get())
+            await self.writer.drain()
+
+
+class Gateway:
+    """Holds the upstream subscriptions of a bot once and re-publishes
+    its frames to local consumers over TCP or a Unix socket.
+
+    Consumers are bots created with the ``gateway`` option set to the
+    gateway's address, they then receive the frames of their channels
+    as if they were subscribed upstream themselves. They send a JSON
+    line holding their ``channels`` once connected, then ``join`` and
+    ``leave`` lines to change them. Channels the gateway's bot wasn't
+    created with are joined upstream once a consumer asks for them, and
+    left again once no consumer needs them anymore.
+
+    Each consumer has its own buffer of ``buffer_size`` frames, once full
+    the oldest frame is dropped, so a slow consumer never holds back the
+    gateway or the other consumers.
+
+    Parameters
+    ----------
+    bot: :class:`~dlive.Bot`
+        The bot holding the upstream subscriptions, usually
+        created with ``raw_only=True``
+    address: :class:`str`
+        Where to listen, ``tcp://host:port`` or ``unix:///path``
+    buffer_size: :class:`int`
+        The most frames buffered for each consumer
+
+    Attributes
+    ----------
+    published: :class:`int`
+        Amount of frames re-published
+    """
+
+    def __init__(self, bot, address: str = "tcp://127.0.0.1:8765", *, buffer_size: int = 1000):
+        self.bot = bot
+        self.address = address
+        self.buffer_size = buffer_size
+        self.published = 0
+        self._server = None
+        self._subscribers = set()
+        self._pinned = {channel.lower() for channel in bot.channels}
+        self._refcounts = {}
+        self._upstream = set()
+        self._syncing = {}
+        bot.add_listener(self._publish, "raw_data")
+
+    @property
+    def subscribers(self) -> list:
+        """The channels and amount of dropped frames of every consumer."""
+        return [{
+            "channels": sorted(subscriber.channels) if subscriber.channels is not None else None,
+            "buffered": subscriber.queue.qsize(),
+            "dropped": subscriber.dropped,
+        } for subscriber in self._subscribers]
+
+    async def _publish(self, data):
+        channel = data.get("id")
+        if channel is None or not self._subscribers:
+            return
+
+        channel = channel.lower()
+        line = None
+        for subscriber in self._subscribers:
+            if subscriber.channels is not None and channel not in subscriber.channels:
+                continue
+
+            if line is None:
+                line = codec.dumps(data).encode() + b"\n"
+
+            subscriber.push(line)
+
+        self.published += 1
+
+    def _acquire(self, channels):
+        """Counts a consumer needing the channels, joining the ones
+        no consumer needed before upstream."""
+        for channel in channels:
+            self._refcounts[channel] = self._refcounts.get(channel, 0) + 1
+            if self._refcounts[channel] == 1:
+                self._sync(channel)
+
+    def _release(self, channels):
+        """Counts a consumer no longer needing the channels, leaving
+        the ones no consumer needs anymore upstream."""
+        for channel in channels:
+            self._refcounts[channel] -= 1
+            if not self._refcounts[channel]:
+                del self._refcounts[channel]
+                self._sync(channel)
+
+    def _sync(self, channel):
+        # Joins run concurrently, so the bot validates them together,
+        # while the joins and leaves of one channel run in order.
+        if channel not in self._pinned and channel not in self._syncing:
+            self._syncing[channel] = self.bot.loop.create_task(self._sync_channel(channel))
+
+    async def _sync_channel(self, channel):
+        try:
+            while (channel in self._refcounts) != (channel in self._upstream):
+                if channel in self._refcounts:
+                    await self.bot.join(channel)
+                    self._upstream.add(channel)
+                else:
+                    await self.bot.leave(channel)
+                    self._upstream.discard(channel)
+        except Exception as exc:
+            logging.warning(msg=f"Could not update the upstream subscription to {channel}: {exc!r}")
+        finally:
+            del self._syncing[channel]
+
+    async def _handle_client(self, reader, writer):
+        try:
+            hello = codec.loads(await reader.readline())
+            subscriber = _Subscriber(writer, hello.get("channels"), self.buffer_size)
+        except Exception:
+            writer.close()
+            return
+
+        self._subscribers.add(subscriber)
+        drain = self.bot.loop.create_task(subscriber.drain())
+
+        try:
+            if subscriber.channels:
+                self._acquire(subscriber.channels)
+
+            # Returns once the consumer disconnects.
+            async for line in reader:
+                joined, left = subscriber.update(codec.loads(line))
+                self._acquire(joined)
+                self._release(left)
+        except (ConnectionError, OSError, ValueError):
+            pass
+        finally:
+            self._subscribers.discard(subscriber)
+            drain.cancel()
+            writer.close()
+            if subscriber.channels:
+                self._release(subscriber.channels)
+
+    async def start(self):
+        """Starts listening for consumers."""
+        url = urlparse(self.address)
+        if url.scheme == "unix":
+            self._server = await asyncio.start_unix_server(self._handle_client, url.path)
+        elif url.scheme == "tcp":
+            self._server = await asyncio.start_server(self._handle_client, url.hostname, url.port)
+        else:
+            raise ValueError(f"Unknown gateway address {self.address!r}, expected tcp://host:port or unix:///path.")
+
+    def run(self, token=""):
+        """Main blocking call that starts the gateway and its bot.
+
+        Parameters
+        ----------
+        token: Optional[:class:`str`]
+            The authorization token used to make authorized requests
+        """
+        self.bot.loop.run_until_complete(self.start())
+        try:
+            self.bot.run(token)
+        finally:
+            self._server.close()
+
+
+class GatewayConnection(WebsocketConnection):
+    """A connection receiving frames from a :class:`Gateway`
+    instead of subscribing to DLive itself."""
+
+    def __init__(self, bot, *, gateway: str, **attrs):
+        super().__init__(bot, **attrs)
+        self._gateway = gateway
+        self._reader = None
+        self._writer = None
+
+    @property
+    def is_connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    @property
+    def latency(self):
+        return None
+
+    async def _connect(self):
+        try:
+            self._reader, self._writer = await _open_connection(self._gateway)
+        except (ConnectionError, OSError) as exc:
+            raise errors.ConnectionError(exc)
+
+        self.loop.create_task(self._authenticate())
+
+    async def _authenticate(self):
+        await self._send({"channels": []})
+        await self._join_stream_channels()
+
+    async def _send(self, request):
+        self._writer.write(codec.dumps(request).encode() + b"\n")
+        await self._writer.drain()
+
+    async def _start_channel(self, channel):
+        await self._send({"join": [channel]})
+
+    async def _stop_channel(self, channel):
+        await self._send({"leave": [channel]})
+
+    async def _websocket_listen(self):
+        backoff = ExponentialBackoff()
+
+        while True:
+            try:
+                line = await self._reader.readline()
+            except (ConnectionError, OSError, ValueError) as exc:
+                # ValueError is raised for a line over LINE_LIMIT.
+                logging.warning(msg=f"Reading from the gateway at {self._gateway} failed: {exc!r}")
+                line = b""
+
+            if not line:
+                if self._tearingdown:
+                    break
+
+                logging.warning(msg=f"Lost the connection to the gateway at {self._gateway}, reconnecting.")
+                self._writer.close()
+                await self._reconnect(backoff)
+                continue
+
+            self.last_frame_at = time.monotonic()
+            await self._enqueue_frame(codec.loads(line))
+
+    def teardown(self):
+        self._tearingdown = True
+        self._dispatcher.close()
+        if self._writer is not None:
+            self._writer.close()
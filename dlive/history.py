@@ -0,0 +1,119 @@
+from collections import OrderedDict
+from datetime import timezone
+
+from .options import DEFAULTS
+
+
+class MessageHistory:
+    """A ring buffer of a chat's most recent messages, indexed
+    by their id and by their author.
+
+    Once ``maxsize`` messages are held the oldest one is dropped
+    for every new one, so its memory stays bounded.
+
+    The ids of the last ``deleted_maxsize`` deleted messages are kept
+    too, since a deletion can be processed before the message it
+    deletes, which is then never added.
+
+    Parameters
+    ----------
+    maxsize: :class:`int`
+        The most messages to keep, ``0`` to keep none
+    deleted_maxsize: :class:`int`
+        The most deleted message ids to keep
+    """
+
+    def __init__(self, maxsize: int = DEFAULTS["message_history_size"], *, deleted_maxsize: int = 1000):
+        self.maxsize = maxsize
+        self.deleted_maxsize = deleted_maxsize
+        self._messages = OrderedDict()
+        self._authors = {}
+        self._deleted = OrderedDict()
+
+    def __len__(self):
+        return len(self._messages)
+
+    def __iter__(self):
+        return iter(list(self._messages.values()))
+
+    def __contains__(self, id):
+        return str(id) in self._messages
+
+    def append(self, message):
+        """Adds a message, dropping the oldest one if the history is full."""
+        if self.maxsize <= 0:
+            return
+
+        key = str(message.id)
+        if key in self._messages or key in self._deleted:
+            return
+
+        self._messages[key] = message
+        self._authors.setdefault(message.author.username.lower(), {})[key] = None
+
+        while len(self._messages) > self.maxsize:
+            self._unindex(*self._messages.popitem(last=False))
+
+    def get(self, id):
+        """Returns the message with the given id, or ``None`` if it isn't held."""
+        return self._messages.get(str(id))
+
+    def pop(self, id):
+        """Removes and returns the message with the given id,
+        or ``None`` if it isn't held."""
+        key = str(id)
+        message = self._messages.pop(key, None)
+        if message is not None:
+            self._unindex(key, message)
+
+        return message
+
+    def delete(self, id):
+        """Removes and returns the message with the given id, or ``None``
+        if it isn't held, and remembers that it was deleted."""
+        key = str(id)
+        self._deleted[key] = None
+        self._deleted.move_to_end(key)
+        while len(self._deleted) > self.deleted_maxsize:
+            self._deleted.popitem(last=False)
+
+        return self.pop(key)
+
+    def is_deleted(self, id) -> bool:
+        """Whether the message with the given id was recently deleted."""
+        return str(id) in self._deleted
+
+    def by_author(self, username: str, *, since=None) -> list:
+        """Returns the held messages of a user, oldest first.
+
+        Parameters
+        ----------
+        username: :class:`str`
+            The authors username
+        since: Optional[:class:`datetime.datetime`]
+            Only return the messages sent at or after this time,
+            in UTC unless it is timezone aware
+        """
+        messages = [self._messages[key] for key in self._authors.get(username.lower(), ())]
+        if since is not None:
+            if since.tzinfo is not None:
+                # Messages hold naive UTC times.
+                since = since.astimezone(timezone.utc).replace(tzinfo=None)
+            messages = [message for message in messages if message.created_at >= since]
+
+        return messages
+
+    def clear(self):
+        self._messages.clear()
+        self._authors.clear()
+        self._deleted.clear()
+
+    def _unindex(self, key, message):
+        author = message.author.username.lower()
+        ids = self._authors.get(author)
+        if ids is None:
+            return
+
+        ids.pop(key, None)
+        if not ids:
+            del self._authors[author]
@@ -1,146 +1,242 @@
+import asyncio
+from json import dumps
+from typing import Union
+
 import aiohttp
 
-from .errors import RequiresAuthorization
+from . import codec
+from .batching import QueryBatcher
+from .cache import UserCache
+from .moderation import ModerationQueue
+from .sender import SendQueue
+from .errors import HttpException, RequiresAuthorization
 from .models.chat import Chat
 from .models.message import Message
-from .models.user import User
+from .models.user import PartialUser, User
+from .options import DEFAULTS
+
+
+USER_FIELDS = "username displayname avatar partnerStatus createdAt wallet{balance totalEarning} canSubscribe banStatus deactivated offlineImage"
+CHAT_FIELDS = "treasureChest{value state} chatInterval chatMode followers{totalCount} hostingLivestream{id permlink ageRestriction thumbnailUrl disableAlert title createdAt totalReward watchingCount language{code language} category{title imgUrl coverImgUrl} view} livestream{id permlink ageRestriction thumbnailUrl disableAlert title createdAt totalReward watchingCount language{code language} category{title imgUrl coverImgUrl} view} about"
+
+
+def _username(value) -> str:
+    """Returns the username of a chat, user or partial user,
+    or the value itself if it already is a username."""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, Chat):
+        return value.name
+
+    return value.username
 
 
 class HTTPSession:
-    def __init__(self, loop, bot):
+    def __init__(self, loop, bot, **options):
         self._bot = bot
-        self._session = aiohttp.ClientSession(loop=loop)
+        self._session = aiohttp.ClientSession(loop=loop, json_serialize=codec.dumps)
         self.BASE = "https://graphigo.prd.dlive.tv/"
+        self.user_cache = UserCache(
+            maxsize=options.get("user_cache_size", DEFAULTS["user_cache_size"]),
+            ttl=options.get("user_cache_ttl", DEFAULTS["user_cache_ttl"]),
+            negative_ttl=options.get("user_cache_negative_ttl", DEFAULTS["user_cache_negative_ttl"]))
+        self._inflight = {}
+        self._batcher = QueryBatcher(
+            self._read, {"user": USER_FIELDS, "chat": CHAT_FIELDS},
+            window=options.get("batch_window", DEFAULTS["batch_window"]),
+            max_size=options.get("batch_max_size", DEFAULTS["batch_max_size"]),
+            loop=loop)
+        self.send_queue = SendQueue(
+            self.send_message,
+            rate=options.get("send_rate", DEFAULTS["send_rate"]),
+            coalesce=options.get("send_coalesce", DEFAULTS["send_coalesce"]),
+            loop=loop)
+        self.moderation = ModerationQueue(
+            self._mutate, self._mutate_batch,
+            window=options.get("moderation_window", DEFAULTS["moderation_window"]),
+            batch=options.get("batch_mutations", DEFAULTS["batch_mutations"]),
+            concurrency=options.get("moderation_concurrency", DEFAULTS["moderation_concurrency"]),
+            loop=loop)
+
+    async def _post(self, json, headers):
+        async with self._session.request(url=self.BASE, method="POST", json=json, headers=headers) as response:
+            return codec.loads(await response.read())
 
     async def _request(self, json, method="POST", headers={}):
         async with self._session.request(url=self.BASE, method=method, json=json, headers=headers) as response:
-            response_json = await response.json()
-            try:
-                error = response_json["errors"]
-                if error[0]["message"] == "Require login":
-                    raise RequiresAuthorization(
-                        "This request requires Authorization. If you supplied a token, it may be invalid")
-            except:
-                return response_json["data"]
-
-    async def get_user(self, username: str):
-        query = {"query": "query{userByDisplayName(displayname: \"user_var\"){username displayname avatar partnerStatus createdAt wallet{balance totalEarning} canSubscribe banStatus deactivated offlineImage}}".replace("user_var", username)}
-        user_json = await self._request(json=query)
-        
-        if user_json["userByDisplayName"] is None:
+            response_json = codec.loads(await response.read())
+
+        errors = response_json.get("errors")
+        data = response_json.get("data")
+        if errors and errors[0].get("message") == "Require login":
+            raise RequiresAuthorization(
+                "This request requires Authorization. If you supplied a token, it may be invalid")
+        if errors and not data:
+            # Rate limits and server errors come without data, which
+            # must not read as every requested user or chat missing.
+            raise HttpException(errors[0].get("message"))
+
+        return data
+
+    @staticmethod
+    def _mutation_error(response_json):
+        """Returns the error DLive rejected a mutation with, if any."""
+        errors = response_json.get("errors")
+        if errors:
+            message = errors[0].get("message")
+            if message == "Require login":
+                return RequiresAuthorization(
+                    "This request requires Authorization. If you supplied a token, it may be invalid")
+            return HttpException(message)
+
+        for result in (response_json.get("data") or {}).values():
+            error = result.get("err") if isinstance(result, dict) else None
+            if error:
+                return HttpException(error.get("message") or error.get("code"))
+
+        return None
+
+    async def _mutate(self, json):
+        """Sends an authorized mutation, raising if DLive rejected it."""
+        response_json = await self._post(json, {"Authorization": self._bot.token})
+
+        error = self._mutation_error(response_json)
+        if error is not None:
+            raise error
+
+        return response_json.get("data")
+
+    async def _mutate_batch(self, operations):
+        """Sends several authorized mutations as one array of operations,
+        returning the error of each one or ``None``, or ``None`` instead
+        of a list if the endpoint doesn't take arrays."""
+        response_json = await self._post(operations, {"Authorization": self._bot.token})
+
+        if isinstance(response_json, dict):
+            # A single error answers the whole array when it isn't understood.
+            error = self._mutation_error(response_json)
+            if isinstance(error, RequiresAuthorization):
+                raise error
             return None
 
-        return User(data=user_json["userByDisplayName"])
+        if not isinstance(response_json, list) or len(response_json) != len(operations):
+            raise HttpException("The endpoint did not answer every operation of the array.")
+
+        return [self._mutation_error(result) for result in response_json]
+
+    async def _read(self, json):
+        """Sends a read query, sharing the response with every
+        concurrent caller sending the identical query."""
+        key = dumps(json, sort_keys=True)
+
+        try:
+            task = self._inflight[key]
+        except KeyError:
+            task = self._inflight[key] = asyncio.ensure_future(self._request(json=json))
+            task.add_done_callback(lambda done: self._read_done(key, done))
+
+        return await asyncio.shield(task)
+
+    def _read_done(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+        if not task.cancelled():
+            task.exception()
+
+    async def get_user(self, username: str, *, partial: bool = False):
+        cached = self.user_cache.get(username, partial=partial)
+        if cached is not None:
+            return cached[0]
+
+        user_json = await self._batcher.load("user", username)
+        user = User(data=user_json) if user_json is not None else None
+        self.user_cache.put(username, user)
+
+        return user
 
     async def get_chat(self, username: str):
-        query = {"query": "query{userByDisplayName(displayname: \"user_var\"){treasureChest{value state} chatInterval chatMode followers{totalCount} hostingLivestream{id permlink ageRestriction thumbnailUrl disableAlert title createdAt totalReward watchingCount language{code language} category{title imgUrl coverImgUrl} view} livestream{id permlink ageRestriction thumbnailUrl disableAlert title createdAt totalReward watchingCount language{code language} category{title imgUrl coverImgUrl} view} about}}".replace("user_var", username)}
-        chat_json = await self._request(json=query)
-        
-        if chat_json["userByDisplayName"] is None:
+        chat_json = await self.get_chat_data(username)
+
+        if chat_json is None:
             return None
-        
-        return Chat(bot=self._bot, data=chat_json["userByDisplayName"], name=username)
 
-    async def send_message(self, chat: Chat, content):
-        streamer = await chat.owner()
-        headers = {"Authorization": self._bot.token}
-        json = {"operationName": "SendStreamChatMessage", "variables": {"input": {"streamer": streamer.username, "message": content, "roomRole": "Member", "subscribing": True,
+        return Chat(bot=self._bot, data=chat_json, name=username)
+
+    async def get_chat_data(self, username: str):
+        return await self._batcher.load("chat", username)
+
+    async def send_message(self, chat: Union[Chat, str], content):
+        json = {"operationName": "SendStreamChatMessage", "variables": {"input": {"streamer": _username(chat), "message": content, "roomRole": "Member", "subscribing": True,
                                                                                   "emojis": []}}, "extensions": {"persistedQuery": {"version": 1, "sha256Hash": "848cbe91a57458ed402716e7b57b7a128c3b5a8385a6ebe14d9deff8d1eda73c"}}}
 
-        await self._request(json=json, headers=headers)
+        await self._mutate(json)
 
-    async def add_moderator(self, chat: Chat, user: User):
-        streamer = await chat.owner()
-        headers = {"Authorization": self._bot.token}
-        json = {"operationName": "AddModerator", "variables": {"username": f"{user.username}", "streamer": streamer.username}, "extensions": {
+    async def add_moderator(self, chat: Union[Chat, str], user: Union[User, PartialUser, str]):
+        json = {"operationName": "AddModerator", "variables": {"username": _username(user), "streamer": _username(chat)}, "extensions": {
             "persistedQuery": {"version": 1, "sha256Hash": "062727612e825ec7e8307b176f7a60fb71bb205eb4cd432020af9c476362471f"}}}
 
-        await self._request(json=json, headers=headers)
+        await self._mutate(json)
 
-    async def remove_moderator(self, chat: Chat, user: User):
-        streamer = await chat.owner()
-        headers = {"Authorization": self._bot.token}
-        json = {"operationName": "RemoveModerator", "variables": {"username": f"{user.username}", "streamer": streamer.username}, "extensions": {
+    async def remove_moderator(self, chat: Union[Chat, str], user: Union[User, PartialUser, str]):
+        json = {"operationName": "RemoveModerator", "variables": {"username": _username(user), "streamer": _username(chat)}, "extensions": {
             "persistedQuery": {"version": 1, "sha256Hash": "6ab7beae3484aede4fc88a2052908ada86474fcabc6f29b7859b71443753b0da"}}}
 
-        await self._request(json=json, headers=headers)
+        await self._mutate(json)
 
-    async def message_delete(self, chat: Chat, message: Message):
-        streamer = await chat.owner()
-        headers = {"Authorization": self._bot.token}
-        json = {"operationName": "DeleteChat", "variables": {"streamer": streamer.username, "id": f"{message.id}"}, "extensions": {
-            "persistedQuery": {"version": 1, "sha256Hash": "7ae6f96161b89d9831dcf217f11f67c1edf5bb311d8819101345ed8eb38f6ed9"}}}
-        
-        await self._request(json=json, headers=headers)
+    async def message_delete(self, chat: Union[Chat, str], message: Message):
+        await self.delete_chat_message(chat, message.id, author=message.author)
 
-    async def ban_user(self, chat: Chat, user: User):
-        streamer = await chat.owner()
-        headers = {"Authorization": self._bot.token}
-        json = {"operationName": "BanStreamChatUser", "variables": {"streamer": streamer.username, "username": f"{user.username}"}, "extensions": {
+    async def ban_user(self, chat: Union[Chat, str], user: Union[User, PartialUser, str]):
+        json = {"operationName": "BanStreamChatUser", "variables": {"streamer": _username(chat), "username": _username(user)}, "extensions": {
             "persistedQuery": {"version": 1, "sha256Hash": "4eaeb20cba25dddc95df6f2acf8018b09a4a699cde468d1e8075d99bb00bacc4"}}}
         
-        await self._request(json=json, headers=headers)
+        await self.moderation.put("ban", _username(chat), _username(user), json)
 
-    async def unban_user(self, chat: Chat, user: User):
-        streamer = await chat.owner()
-        headers = {"Authorization": self._bot.token}
-        json = {"operationName": "UnbanStreamChatUser", "variables": {"streamer": streamer.username, "username": f"{user.username}"}, "extensions": {
+    async def unban_user(self, chat: Union[Chat, str], user: Union[User, PartialUser, str]):
+        json = {"operationName": "UnbanStreamChatUser", "variables": {"streamer": _username(chat), "username": _username(user)}, "extensions": {
             "persistedQuery": {"version": 1, "sha256Hash": "574e9a8db47ff719844359964d6108320e4d35f0378d7f983651d87b315d4008"}}}
         
-        await self._request(json=json, headers=headers)
+        await self._mutate(json)
 
-    async def set_chat_interval(self, chat: Chat, seconds: int):
-        streamer = await chat.owner()
-        headers = {"Authorization": self._bot.token}
-        json = {"operationName": "SetChatInterval", "variables": {"streamer": streamer.username, "seconds": seconds}, "extensions": {
+    async def set_chat_interval(self, chat: Union[Chat, str], seconds: int):
+        json = {"operationName": "SetChatInterval", "variables": {"streamer": _username(chat), "seconds": seconds}, "extensions": {
             "persistedQuery": {"version": 1, "sha256Hash": "353fa9498a47532deb97680ea72647cba960ab1a90bda4cdf78da7b2d4d3e4b0"}}}
         
-        await self._request(json=json, headers=headers)
+        await self._mutate(json)
 
-    async def add_filter_word(self, chat: Chat, word: str):
-        streamer = await chat.owner()
-        headers = {"Authorization": self._bot.token}
-        json = {"operationName": "AddFilterWord", "variables": {"streamer": streamer.username, "word": f"{word}"}, "extensions": {
+    async def add_filter_word(self, chat: Union[Chat, str], word: str):
+        json = {"operationName": "AddFilterWord", "variables": {"streamer": _username(chat), "word": f"{word}"}, "extensions": {
             "persistedQuery": {"version": 1, "sha256Hash": "569b22423f4c76fa26a07f9870774e8074642824b460fd2c48000afeddc674e5"}}}
 
-        await self._request(json=json, headers=headers)
+        await self._mutate(json)
 
-    async def delete_filter_word(self, chat: Chat, word: str):
-        streamer = await chat.owner()
-        headers = {"Authorization": self._bot.token}
-        json = {"operationName": "DeleteFilterWord", "variables": {"streamer": streamer.username, "word": f"{word}"}, "extensions": {
+    async def delete_filter_word(self, chat: Union[Chat, str], word: str):
+        json = {"operationName": "DeleteFilterWord", "variables": {"streamer": _username(chat), "word": f"{word}"}, "extensions": {
             "persistedQuery": {"version": 1, "sha256Hash": "c20ecdc121e8f97bc10dba4c6734c34c20d5e54a419c2fb1cd09637017e4b3f9"}}}
 
-        await self._request(json=json, headers=headers)
+        await self._mutate(json)
 
-    async def ban_emote(self, chat: Chat, emote: str):
-        streamer = await chat.owner()
-        headers = {"Authorization": self._bot.token}
-        json = {"operationName": "EmoteBan", "variables": {"emoteStr": f"{emote}", "streamer": streamer.username}, "extensions": {
+    async def ban_emote(self, chat: Union[Chat, str], emote: str):
+        json = {"operationName": "EmoteBan", "variables": {"emoteStr": f"{emote}", "streamer": _username(chat)}, "extensions": {
             "persistedQuery": {"version": 1, "sha256Hash": "ba0c6a172eb57160fc681d477e65015275103ec023b60299943203ea75384fa8"}}}
 
-        await self._request(json=json, headers=headers)
+        await self._mutate(json)
 
-    async def unban_emote(self, chat: Chat, emote: str):
-        streamer = await chat.owner()
-        headers = {"Authorization": self._bot.token}
-        json = {"operationName": "EmoteUnban", "variables": {"emoteStr": f"{emote}", "streamer": streamer.username}, "extensions": {
+    async def unban_emote(self, chat: Union[Chat, str], emote: str):
+        json = {"operationName": "EmoteUnban", "variables": {"emoteStr": f"{emote}", "streamer": _username(chat)}, "extensions": {
             "persistedQuery": {"version": 1, "sha256Hash": "0f979b4572a803fa47aab50681cb0e9f79724dd78db1c10ac2cc0b169573c201"}}}
 
-        await self._request(json=json, headers=headers)
+        await self._mutate(json)
 
-    async def timeout_user(self, chat: Chat, user: User, duration: int):
-        streamer = await chat.owner()
-        headers = {"Authorization": self._bot.token}
-        json = {"operationName": "UserTimeoutSet", "variables": {"streamer": streamer.username, "username": f"{user.username}", "duration": duration},
+    async def timeout_user(self, chat: Union[Chat, str], user: Union[User, PartialUser, str], duration: int):
+        json = {"operationName": "UserTimeoutSet", "variables": {"streamer": _username(chat), "username": _username(user), "duration": duration},
                 "extensions": {"persistedQuery": {"version": 1, "sha256Hash": "89453f238a70a36bedaa2cb24ef75d8bdef09506dc5b17ba471530ce4c73254b"}}}
 
-        await self._request(json=json, headers=headers)
+        await self.moderation.put("timeout", _username(chat), _username(user), json)
 
-    async def delete_chat_message(self, chat: Chat, id):
-        streamer = await chat.owner()
-        headers = {"Authorization": self._bot.token}
-        json = {"operationName": "DeleteChat", "variables": {"streamer": streamer.username, "id": f"{id}"}, "extensions": {
+    async def delete_chat_message(self, chat: Union[Chat, str], id, author: Union[User, PartialUser, str] = None):
+        json = {"operationName": "DeleteChat", "variables": {"streamer": _username(chat), "id": f"{id}"}, "extensions": {
             "persistedQuery": {"version": 1, "sha256Hash": "7ae6f96161b89d9831dcf217f11f67c1edf5bb311d8819101345ed8eb38f6ed9"}}}
 
-        await self._request(json=json, headers=headers)
\ No newline at end of file
+        await self.moderation.put("delete", _username(chat), _username(author) if author is not None else None, json)
\ No newline at end of file
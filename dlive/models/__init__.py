@@ -1,5 +1,6 @@
 from .chat import Chat
+from .events import Delete, EmoteAdd, Gift, Host, ModeChange, Subscription
 from .livestream import Livestream
 from .message import Message
 from .tiny_models import *
-from .user import User
\ No newline at end of file
+from .user import PartialUser, User
\ No newline at end of file
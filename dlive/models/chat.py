@@ -1,7 +1,12 @@
+import asyncio
+from typing import Union
+
 from ..enums import ChatMode
+from ..history import MessageHistory
+from ..options import DEFAULTS
 from .livestream import Livestream
 from .tiny_models import TreasureChest
-from .user import User
+from .user import PartialUser, User
 
 
 class Chat:
@@ -33,10 +38,17 @@ class Chat:
         about it, the amount, etc.
     owner: :class:`~dlive.models.User`
         The owner of a chat
+    history: :class:`~dlive.history.MessageHistory`
+        The most recent messages received in the chat
     """
 
     def __init__(self, bot, data, name):
         self.name = name.lower()
+        self._bot = bot
+        self.history = MessageHistory(getattr(bot, "_message_history_size", DEFAULTS["message_history_size"]))
+        self._update(data)
+
+    def _update(self, data):
         self.about = data["about"]
         self.livestream = Livestream(
             data["livestream"]) if data["livestream"] is not None else None
@@ -46,7 +58,6 @@ class Chat:
         self.chat_mode = ChatMode[data["chatMode"].lower()]
         self.chat_interval: int = data["chatInterval"]
         self.treasure_chest = TreasureChest(data=data["treasureChest"])
-        self._bot = bot
 
     def __str__(self):
         return self.name
@@ -66,52 +77,87 @@ class Chat:
         """
         return await self._bot.get_user(self.name)
 
-    async def send(self, content):
-        """Sends a message to a DLive chat.
+    def send(self, content) -> asyncio.Future:
+        """Queues a message to send to a DLive chat.
+
+        Messages are sent in order, no faster than the chat's
+        :attr:`chat_interval`, see :class:`~dlive.sender.SendQueue`.
 
         Parameters
         ----------
         content: :class:`str`
             What to send to the chat
+
+        Returns
+        -------
+        :class:`asyncio.Future`
+            Resolves once the message is sent. Awaiting it raises
+            :class:`~dlive.errors.HttpException` if DLive rejected it
+        """
+        return self._bot.http.send_queue.put(self, content)
+
+    async def purge(self, user: Union[User, PartialUser, str], *, since=None) -> list:
+        """Deletes the messages of a user still held in :attr:`history`.
+
+        The deletions are sent concurrently through the
+        bot's :class:`~dlive.moderation.ModerationQueue`.
+
+        Parameters
+        ----------
+        user: Union[:class:`~dlive.models.User`, :class:`~dlive.models.PartialUser`, :class:`str`]
+            The user whose messages to delete
+        since: Optional[:class:`datetime.datetime`]
+            Only delete the messages sent at or after this time,
+            in UTC unless it is timezone aware
+
+        Returns
+        -------
+        :class:`list`
+            The deleted :class:`~dlive.models.Message`
         """
-        await self._bot.http.send_message(self, content)
+        username = user if isinstance(user, str) else user.username
+        messages = self.history.by_author(username, since=since)
+
+        await asyncio.gather(*(
+            self._bot.http.delete_chat_message(self, message.id, author=message.author) for message in messages))
+        return messages
 
-    async def add_moderator(self, user: User):
+    async def add_moderator(self, user: Union[User, PartialUser, str]):
         """Adds someone as a chat moderator.
 
         Parameters
         ----------
-        user: :class:`~dlive.User`
+        user: Union[:class:`~dlive.models.User`, :class:`~dlive.models.PartialUser`, :class:`str`]
             The user to make a moderator
         """
         await self._bot.http.add_moderator(self, user)
 
-    async def remove_moderator(self, user: User):
+    async def remove_moderator(self, user: Union[User, PartialUser, str]):
         """Removes someone as a chat moderator.
 
         Parameters
         ----------
-        user: :class:`~dlive.models.User`
+        user: Union[:class:`~dlive.models.User`, :class:`~dlive.models.PartialUser`, :class:`str`]
             The user to remove as a moderator
         """
         await self._bot.http.remove_moderator(self, user)
 
-    async def ban(self, user: User):
+    async def ban(self, user: Union[User, PartialUser, str]):
         """Bans someone from the chat.
 
         Parameters
         ----------
-        user: :class:`~dlive.models.User`
+        user: Union[:class:`~dlive.models.User`, :class:`~dlive.models.PartialUser`, :class:`str`]
             The user to ban
         """
         await self._bot.http.ban_user(self, user)
 
-    async def unban(self, user: User):
+    async def unban(self, user: Union[User, PartialUser, str]):
         """Un-Bans someone from the chat.
 
         Parameters
         ----------
-        user: :class:`~dlive.models.User`
+        user: Union[:class:`~dlive.models.User`, :class:`~dlive.models.PartialUser`, :class:`str`]
             The user to un-ban
         """
         await self._bot.http.unban_user(self, user)
@@ -167,24 +213,24 @@ class Chat:
         """
         await self._bot.http.unban_emote(self, emote)
 
-    async def timeout_user(self, user: User, duration: int):
+    async def timeout_user(self, user: Union[User, PartialUser, str], duration: int):
         """Times out a user for a specified duration.
 
         Parameters
         ----------
-        user: :class:`~dlive.models.User`
+        user: Union[:class:`~dlive.models.User`, :class:`~dlive.models.PartialUser`, :class:`str`]
             The user to timeout
         duration: :class:`int`
             The amount of minutes to timeout the user
         """
         await self._bot.http.timeout_user(self, user, duration)
 
-    async def untimeout_user(self, user: User):
+    async def untimeout_user(self, user: Union[User, PartialUser, str]):
         """Un-Times out a user.
 
         Parameters
         ----------
-        user: :class:`~dlive.models.User`
+        user: Union[:class:`~dlive.models.User`, :class:`~dlive.models.PartialUser`, :class:`str`]
             The user to un-timeout
         """
         await self._bot.http.timeout_user(self, user, 0)
\ No newline at end of file
@@ -0,0 +1,141 @@
+from ..enums import ChatMode
+from .user import PartialUser
+
+
+class Gift:
+    """Represents a gift sent to a chat.
+
+    Attributes
+    ----------
+    chat: :class:`models.Chat`
+        The chat the gift was sent to
+    id: :class:`str`
+        The id of the gift event
+    gift: :class:`str`
+        The kind of gift sent
+    amount: :class:`int`
+        How many of the gift were sent
+    recent_count: :class:`int`
+        How many of the gift were recently sent in a row
+    expire_duration: :class:`int`
+        How long the gift is shown for
+    user: :class:`models.PartialUser`
+        Who sent the gift
+    """
+
+    def __init__(self, bot, data, chat):
+        self.chat = chat
+        self.id = data["id"]
+        self.gift = data["gift"]
+        self.amount: int = int(data["amount"])
+        self.recent_count: int = data["recentCount"]
+        self.expire_duration: int = data["expireDuration"]
+        self.user = PartialUser(bot, data)
+
+    def __str__(self):
+        return self.gift
+
+
+class Host:
+    """Represents a chat being hosted.
+
+    Attributes
+    ----------
+    chat: :class:`models.Chat`
+        The chat being hosted
+    id: :class:`str`
+        The id of the host event
+    viewers: :class:`int`
+        How many viewers came along with the host
+    user: :class:`models.PartialUser`
+        Who is hosting the chat
+    """
+
+    def __init__(self, bot, data, chat):
+        self.chat = chat
+        self.id = data["id"]
+        self.viewers: int = data["viewer"]
+        self.user = PartialUser(bot, data)
+
+
+class Subscription:
+    """Represents someone subscribing to a chat.
+
+    Attributes
+    ----------
+    chat: :class:`models.Chat`
+        The chat subscribed to
+    id: :class:`str`
+        The id of the subscription event
+    month: :class:`int`
+        How many months the user has been subscribed for
+    user: :class:`models.PartialUser`
+        Who subscribed
+    """
+
+    def __init__(self, bot, data, chat):
+        self.chat = chat
+        self.id = data["id"]
+        self.month: int = data["month"]
+        self.user = PartialUser(bot, data)
+
+
+class Delete:
+    """Represents messages being deleted from a chat.
+
+    Attributes
+    ----------
+    chat: :class:`models.Chat`
+        The chat the messages were deleted from
+    ids: :class:`list`
+        The ids of the deleted messages
+    messages: :class:`list`
+        The deleted :class:`~dlive.models.Message` that were still
+        held in the chat's history, their content is kept there
+    """
+
+    def __init__(self, bot, data, chat, messages=()):
+        self.chat = chat
+        self.ids = list(data["ids"])
+        self.messages = list(messages)
+
+
+class ModeChange:
+    """Represents a chat changing its mode.
+
+    Attributes
+    ----------
+    chat: :class:`models.Chat`
+        The chat which changed its mode
+    mode: :class:`dlive.enums.ChatMode`
+        The new chat mode
+    """
+
+    def __init__(self, bot, data, chat):
+        self.chat = chat
+        self.mode = ChatMode[data["mode"].lower()]
+
+
+class EmoteAdd:
+    """Represents an emote added to a chat.
+
+    Attributes
+    ----------
+    chat: :class:`models.Chat`
+        The chat the emote was added to
+    id: :class:`str`
+        The id of the emote event
+    emote: :class:`str`
+        The emote which was added
+    user: :class:`models.PartialUser`
+        Who added the emote
+    """
+
+    def __init__(self, bot, data, chat):
+        self.chat = chat
+        self.id = data["id"]
+        self.emote = data["emote"]
+        self.user = PartialUser(bot, data)
+
+    def __str__(self):
+        return self.emote
@@ -16,8 +16,9 @@ class Message:
         What the message contained
     created_at: :class:`datetime`
         When the message was sent
-    author: :class:`models.User`
-        Who sent the message
+    author: :class:`models.PartialUser`
+        Who sent the message, use :meth:`~dlive.models.PartialUser.fetch`
+        to get the full user
     command: Optional[:class:`dlive.Command`]
         The command of the message
     """
@@ -39,6 +40,4 @@ class Message:
 
     async def delete(self):
         """Deletes the message from the chat."""
-        chat = await self._bot.get_chat(self._data["sender"]["username"])
-
-        return await self._bot.http.delete_chat_message(chat, self.id)
\ No newline at end of file
+        return await self._bot.http.delete_chat_message(self.chat, self.id, author=self.author)
\ No newline at end of file
@@ -64,7 +64,7 @@ class User:
         return self.displayname
 
     def __eq__(self, other_user):
-        return isinstance(other_user, User) and other_user.username == self.username
+        return isinstance(other_user, (User, PartialUser)) and other_user.username == self.username
 
     def __ne__(self, other_user):
         return not self.__eq__(other_user)
@@ -102,4 +102,81 @@ class User:
     @property
     def is_stream_banned(self) -> bool:
         """Whether the user is banned from streaming."""
-        return self.ban_status == BanStatus.ban_from_streaming
\ No newline at end of file
+        return self.ban_status == BanStatus.ban_from_streaming
+
+class PartialUser:
+    """Represents a user as seen from a chat event.
+
+    Built from the sender info sent along with every chat event,
+    so no request is made to create one. Use :meth:`fetch` to get
+    the full :class:`~dlive.models.User`.
+
+    Attributes
+    ----------
+    id: :class:`str`
+        The users unique id
+    username: :class:`str`
+        The users unique username
+    displayname: :class:`str`
+        The users display name
+    avatar_url: :class:`str`
+        Url to the users avatar image
+    partner_status: :class:`dlive.enums.PartnerStatus`
+        The status of their DLive partnership
+    role: :class:`str`
+        The users global role
+    room_role: :class:`str`
+        The users role in the chat the event came from
+    is_subscribing: :class:`bool`
+        Whether the user is subscribed to the chat the
+        event came from
+    mention: :class:`str`
+        The users name in mention form
+    """
+
+    def __init__(self, bot, data):
+        sender = data["sender"]
+        self._bot = bot
+        self.id = sender.get("id")
+        self.username = sender["username"]
+        self.displayname = sender["displayname"]
+        self.avatar_url = sender.get("avatar")
+        self.partner_status = PartnerStatus[
+            sender["partnerStatus"].lower()] if sender.get("partnerStatus") else PartnerStatus.none
+        self.role = data.get("role")
+        self.room_role = data.get("roomRole")
+        self.is_subscribing: bool = data.get("subscribing", False)
+
+    def __str__(self):
+        return self.displayname
+
+    def __eq__(self, other_user):
+        return isinstance(other_user, (User, PartialUser)) and other_user.username == self.username
+
+    def __ne__(self, other_user):
+        return not self.__eq__(other_user)
+
+    @property
+    def mention(self) -> str:
+        """A string formatted to mention a user."""
+        return f"@{self.displayname}"
+
+    @property
+    def is_moderator(self) -> bool:
+        """Whether the user is a moderator in the chat the event came from."""
+        return self.room_role == "Moderator"
+
+    @property
+    def is_owner(self) -> bool:
+        """Whether the user owns the chat the event came from."""
+        return self.room_role == "Owner"
+
+    async def fetch(self) -> User:
+        """Fetches the full user.
+
+        Returns
+        -------
+        Optional[:class:`~dlive.models.User`]
+            The user or ``None`` if not found.
+        """
+        return await self._bot.get_user(self.username)
@@ -0,0 +1,218 @@
+import asyncio
+import logging
+from json import dumps
+
+from .options import DEFAULTS
+
+ACTION_PRIORITIES = {"ban": 0, "timeout": 1, "delete": 2}
+# Variables already part of an action's key, normalized.
+TARGET_VARIABLES = ("streamer", "username")
+
+
+class _Action:
+    __slots__ = ("kind", "chat", "user", "json", "variables", "future")
+
+    def __init__(self, kind, chat, user, json, variables, future):
+        self.kind = kind
+        self.chat = chat
+        self.user = user
+        self.json = json
+        self.variables = variables
+        self.future = future
+
+
+class ModerationQueue:
+    """Collects moderation mutations and sends them together.
+
+    Actions are gathered for ``window`` seconds, or until ``max_size`` of
+    them are pending. Identical pending actions, the same kind of action
+    on the same chat and user, case insensitively, with the same other
+    variables, share one request. A new timeout replaces the pending
+    timeout of the same user, and a ban replaces the pending deletes and
+    timeouts of the same user in the same chat, since it makes them
+    redundant. Replaced actions succeed or fail with the one replacing them.
+
+    Collected actions are sent bans first. With ``batch`` they are sent
+    as one array of operations per request, otherwise, or once the
+    endpoint answered that it doesn't take arrays, as up to
+    ``concurrency`` concurrent requests.
+
+    Parameters
+    ----------
+    send:
+        Coroutine function sending the json of one mutation,
+        raising if it was rejected
+    send_batch:
+        Coroutine function sending a list of mutation jsons in one
+        request, returning the exception of each one or ``None``.
+        Returns ``None`` instead of a list if the endpoint doesn't
+        take arrays
+    window: :class:`float`
+        How long, in seconds, to collect actions before sending them
+    max_size: :class:`int`
+        The most actions to send in one request
+    batch: :class:`bool`
+        Whether to send arrays of operations
+    concurrency: :class:`int`
+        The most requests in flight when not batching
+    loop: asyncio.BaseEventLoop [Optional]
+        The asyncio event loop to use
+
+    Attributes
+    ----------
+    deduplicated: :class:`int`
+        Amount of actions that shared a pending identical action
+    superseded: :class:`int`
+        Amount of deletes and timeouts replaced by a ban or a newer timeout
+    """
+
+    def __init__(self, send, send_batch, *, window=DEFAULTS["moderation_window"], max_size=50,
+                 batch=DEFAULTS["batch_mutations"], concurrency=DEFAULTS["moderation_concurrency"], loop=None):
+        self._send = send
+        self._send_batch = send_batch
+        self.window = window
+        self.max_size = max_size
+        self.batch = batch
+        self.loop = loop or asyncio.get_event_loop()
+        self.deduplicated = 0
+        self.superseded = 0
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._pending = {}
+        self._handle = None
+
+    def __len__(self):
+        return len(self._pending)
+
+    async def put(self, kind: str, chat: str, user: str, json: dict):
+        """Queues a mutation and waits until it is sent.
+
+        Parameters
+        ----------
+        kind: :class:`str`
+            ``"ban"``, ``"timeout"`` or ``"delete"``
+        chat: :class:`str`
+            The name of the chat the action applies to
+        user: Optional[:class:`str`]
+            The username the action targets, or the author
+            of the deleted message if known
+        json: :class:`dict`
+            The mutation to send
+        """
+        chat, user = chat.lower(), user.lower() if user is not None else None
+        variables = dumps({name: value for name, value in json.get("variables", {}).items()
+                           if name not in TARGET_VARIABLES}, sort_keys=True)
+        # A user has one timeout, the newest replaces the pending one.
+        key = (kind, chat, user) if kind == "timeout" else (kind, chat, user, variables)
+
+        action = self._pending.get(key)
+        if action is not None and action.variables == variables:
+            self.deduplicated += 1
+            return await asyncio.shield(action.future)
+
+        ban = self._pending_ban(chat, user) if kind != "ban" and user is not None else None
+        if ban is not None:
+            self.superseded += 1
+            return await asyncio.shield(ban.future)
+
+        future = self.loop.create_future()
+        future.add_done_callback(self._retrieve)
+
+        if action is not None:
+            del self._pending[key]
+            self._settle_with(action, future)
+        if kind == "ban":
+            self._supersede(chat, user, future)
+
+        self._pending[key] = _Action(kind, chat, user, json, variables, future)
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._handle is None:
+            self._handle = self.loop.call_later(self.window, self._flush)
+
+        return await asyncio.shield(future)
+
+    @staticmethod
+    def _retrieve(future):
+        if not future.cancelled():
+            future.exception()
+
+    def _pending_ban(self, chat, user):
+        return next((
+            action for action in self._pending.values()
+            if action.kind == "ban" and action.chat == chat and action.user == user), None)
+
+    def _supersede(self, chat, user, future):
+        for key, action in list(self._pending.items()):
+            if action.kind in ("delete", "timeout") and action.chat == chat and action.user == user:
+                del self._pending[key]
+                self._settle_with(action, future)
+
+    def _settle_with(self, action, future):
+        """Resolves a replaced action once the action replacing it is sent,
+        failing it if that one fails."""
+        self.superseded += 1
+
+        def settle(done):
+            if action.future.done():
+                return
+            if done.cancelled():
+                action.future.cancel()
+            elif done.exception() is not None:
+                action.future.set_exception(done.exception())
+            else:
+                action.future.set_result(None)
+
+        future.add_done_callback(settle)
+
+    def _flush(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+        if not self._pending:
+            return
+
+        actions = sorted(self._pending.values(), key=lambda action: ACTION_PRIORITIES.get(action.kind, 3))
+        self._pending = {}
+
+        if self.batch:
+            for start in range(0, len(actions), self.max_size):
+                self.loop.create_task(self._dispatch_batch(actions[start:start + self.max_size]))
+        else:
+            for action in actions:
+                self.loop.create_task(self._dispatch(action))
+
+    async def _dispatch(self, action):
+        async with self._semaphore:
+            try:
+                await self._send(action.json)
+            except Exception as exc:
+                if not action.future.done():
+                    action.future.set_exception(exc)
+            else:
+                if not action.future.done():
+                    action.future.set_result(None)
+
+    async def _dispatch_batch(self, actions):
+        try:
+            results = await self._send_batch([action.json for action in actions])
+        except Exception as exc:
+            for action in actions:
+                if not action.future.done():
+                    action.future.set_exception(exc)
+            return
+
+        if results is None:
+            # The endpoint doesn't take arrays, pipeline single requests from now on.
+            logging.warning(msg="The endpoint does not take arrays of mutations, sending them one by one.")
+            self.batch = False
+            await asyncio.gather(*(self._dispatch(action) for action in actions))
+            return
+
+        for action, error in zip(actions, results):
+            if action.future.done():
+                continue
+            if error is not None:
+                action.future.set_exception(error)
+            else:
+                action.future.set_result(None)
@@ -0,0 +1,46 @@
+"""The options :class:`~dlive.Bot` accepts and their defaults.
+
+Every component reading an option falls back to :data:`DEFAULTS`,
+so each default is only defined here.
+"""
+from .enums import OverloadPolicy
+
+__all__ = ("DEFAULTS", "check_options")
+
+DEFAULTS = {
+    "chat_refresh_interval": None,
+    "user_cache_size": 1000,
+    "user_cache_ttl": 300.0,
+    "user_cache_negative_ttl": 30.0,
+    "batch_window": 0.002,
+    "batch_max_size": 50,
+    "max_concurrency": 64,
+    "queue_capacity": 10000,
+    "overload_policy": OverloadPolicy.block,
+    "sample_rate": 10,
+    "undroppable_events": ("Ban", "Timeout", "Delete", "ChatMode", "Live", "Offline"),
+    "event_priorities": {},
+    "starvation_limit": 16,
+    "shard_count": 1,
+    "shard_strategy": "count",
+    "gateway": None,
+    "redundant": False,
+    "dedupe_size": 10000,
+    "pair_window": 2.0,
+    "stall_timeout": None,
+    "join_concurrency": 50,
+    "send_rate": 5.0,
+    "send_coalesce": False,
+    "moderation_window": 0.005,
+    "batch_mutations": False,
+    "moderation_concurrency": 8,
+    "message_history_size": 200,
+    "raw_only": False,
+}
+
+
+def check_options(options: dict):
+    """Raises :class:`TypeError` if any option isn't a known one."""
+    unknown = sorted(set(options) - set(DEFAULTS))
+    if unknown:
+        raise TypeError(f"Unknown option(s) {', '.join(map(repr, unknown))}.")
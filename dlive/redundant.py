@@ -0,0 +1,267 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+
+import websockets
+
+from . import codec, errors
+from .backoff import ExponentialBackoff
+from .websocket import WebsocketConnection
+from .options import DEFAULTS
+
+
+class RecentIds:
+    """A bounded set remembering the last ``maxsize`` keys added to it.
+
+    Parameters
+    ----------
+    maxsize: :class:`int`
+        The most keys to remember
+    """
+
+    def __init__(self, maxsize: int = DEFAULTS["dedupe_size"]):
+        self.maxsize = maxsize
+        self._keys = OrderedDict()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def add(self, key) -> bool:
+        """Remembers a key, returning whether it is new."""
+        if key in self._keys:
+            return False
+
+        self._keys[key] = None
+        if len(self._keys) > self.maxsize:
+            self._keys.popitem(last=False)
+
+        return True
+
+
+class RedundantConnection(WebsocketConnection):
+    """A connection keeping a standby websocket subscribed to the same
+    channels, so no event is lost while one of them reconnects.
+
+    Stream messages are received on both websockets and deduplicated by
+    their id. Messages without one, like ``Live`` or ``Delete``, are
+    paired across the websockets instead: one is dropped if the same
+    message arrived on the other websocket less than ``pair_window``
+    seconds earlier, so a later repeat of it is still dispatched. When the
+    primary websocket drops the standby is promoted at once, and the
+    dropped one reconnects in the background to become the new standby.
+    Both websockets retry their failed subscriptions on their own.
+
+    Attributes
+    ----------
+    duplicates_suppressed: :class:`int`
+        Amount of stream messages dropped for having been
+        received on the other websocket already
+    failovers: :class:`int`
+        Amount of times the standby was promoted
+    last_failover_time: Optional[:class:`float`]
+        Seconds between the primary dropping the last time and another
+        subscribed websocket replacing it, ``None`` if it never dropped.
+        Close to zero unless the standby was down too
+    """
+
+    def __init__(self, bot, **attrs):
+        super().__init__(bot, **attrs)
+        self.duplicates_suppressed = 0
+        self.failovers = 0
+        self.last_failover_time = None
+        self._standby = None
+        self._failed_at = None
+        self._subscribed = []
+        self._states = {}
+        self._recent = RecentIds(attrs.get("dedupe_size", DEFAULTS["dedupe_size"]))
+        self._pair_window = attrs.get("pair_window", DEFAULTS["pair_window"])
+        self._unpaired = OrderedDict()
+
+    @property
+    def is_connected(self) -> bool:
+        return any(websocket is not None and websocket.open for websocket in (self._websocket, self._standby))
+
+    async def _connect(self):
+        self._states.clear()
+        self._promote(await self._open_websocket())
+        self._standby = await self._open_websocket()
+        self.last_frame_at = time.monotonic()
+        self._last_keepalive_at = None
+        self.loop.create_task(self._authenticate())
+
+    async def _authenticate(self):
+        await self._init_websocket(self._websocket)
+        await self._init_websocket(self._standby)
+
+        self._subscribed = []
+        await self._join_stream_channels()
+
+    async def _start_channel(self, channel):
+        for websocket in (self._websocket, self._standby):
+            if websocket is not None and websocket.open:
+                await self._subscribe(channel, websocket)
+
+        self._subscribed.append(channel)
+
+    async def _stop_channel(self, channel):
+        self._subscribed = [subscribed for subscribed in self._subscribed if subscribed.lower() != channel.lower()]
+        for websocket in (self._websocket, self._standby):
+            if websocket is not None and websocket.open:
+                await self._unsubscribe(channel, websocket)
+
+    async def _resubscribe(self):
+        websocket = await self._open_websocket()
+        await self._init_websocket(websocket)
+        for channel in self._subscribed:
+            await self._subscribe(channel, websocket)
+
+        return websocket
+
+    def _promote(self, websocket):
+        self._websocket = websocket
+        self.subscriptions = self._subscription_states(websocket)
+
+    def _subscription_states(self, websocket):
+        return self._states.setdefault(websocket, {}) if websocket is not None else {}
+
+    def _forget_subscription(self, key):
+        super()._forget_subscription(key)
+        for states in self._states.values():
+            states.pop(key, None)
+
+    def _drop(self, websocket):
+        self._states.pop(websocket, None)
+        for retry in [retry for retry in self._retries if retry[0] is websocket]:
+            del self._retries[retry]
+
+    async def _websocket_listen(self):
+        watchdog = self.loop.create_task(self._watchdog())
+        try:
+            await asyncio.gather(self._read(self._websocket), self._read(self._standby))
+        finally:
+            watchdog.cancel()
+
+    async def _read(self, websocket):
+        backoff = ExponentialBackoff()
+
+        while True:
+            try:
+                data = codec.loads(await websocket.recv(**self._recv_options))
+            except websockets.ConnectionClosed:
+                if self._tearingdown:
+                    break
+
+                self._drop(websocket)
+                if websocket is self._websocket:
+                    dropped_at = time.monotonic()
+                    standby, self._standby = self._standby, None
+                    self._promote(standby)
+                    self.failovers += 1
+                    if standby is not None and standby.open:
+                        self.last_failover_time = time.monotonic() - dropped_at
+                        logging.warning(
+                            msg=f"Primary websocket of shard {self.shard_id} dropped, promoted the standby.")
+                    else:
+                        self._failed_at = dropped_at
+                else:
+                    self._standby = None
+
+                attempts = 0
+                while True:
+                    if attempts:
+                        await asyncio.sleep(backoff.delay())
+                    try:
+                        websocket = await self._resubscribe()
+                    except (errors.ConnectionError, websockets.ConnectionClosed):
+                        attempts += 1
+                        continue
+                    break
+
+                backoff.reset()
+
+                if self._websocket is None or not self._websocket.open:
+                    self._promote(websocket)
+                    if self._failed_at is not None:
+                        self.last_failover_time = time.monotonic() - self._failed_at
+                        self._failed_at = None
+                else:
+                    self._standby = websocket
+
+                self.reconnects += 1
+                continue
+
+            self._track_subscription(data, websocket)
+
+            if data["type"] != "data":
+                if websocket is not self._websocket:
+                    continue
+                if data["type"] == "connection_error":
+                    raise errors.ConnectionError(data["payload"]["message"])
+
+                self._frame_received(data)
+                await self._enqueue_frame(data)
+                continue
+
+            if not self._deduplicate(data, websocket):
+                continue
+
+            self._frame_received(data)
+            await self._enqueue_frame(data)
+
+    def _deduplicate(self, data, websocket):
+        """Removes the stream messages already received from the frame,
+        returning whether any are left."""
+        try:
+            items = data["payload"]["data"]["streamMessageReceived"]
+        except (KeyError, TypeError):
+            return True
+
+        channel = data.get("id")
+        now = time.monotonic()
+        fresh = [item for item in items if self._is_fresh(channel, item, websocket, now)]
+
+        if len(fresh) != len(items):
+            self.duplicates_suppressed += len(items) - len(fresh)
+            data["payload"]["data"]["streamMessageReceived"] = fresh
+
+        return bool(fresh)
+
+    def _is_fresh(self, channel, item, websocket, now):
+        try:
+            return self._recent.add((channel, item["id"]))
+        except KeyError:
+            return self._pair((channel, codec.dumps(item)), websocket, now)
+
+    def _pair(self, key, websocket, now):
+        """Returns whether a message without an id is new, which it isn't
+        if the other websocket received it within ``pair_window`` seconds
+        and it wasn't paired with another copy yet."""
+        unpaired = self._unpaired
+        while unpaired:
+            latest = next(iter(unpaired.values()))[-1]
+            if now - latest[1] <= self._pair_window:
+                break
+            unpaired.popitem(last=False)
+
+        arrivals = [arrival for arrival in unpaired.pop(key, ()) if now - arrival[1] <= self._pair_window]
+        for index, (other, _) in enumerate(arrivals):
+            if other is not websocket:
+                del arrivals[index]
+                if arrivals:
+                    unpaired[key] = arrivals
+                return False
+
+        arrivals.append((websocket, now))
+        unpaired[key] = arrivals
+        return True
+
+    def teardown(self):
+        standby, self._standby = self._standby, None
+        super().teardown()
+        if standby is not None:
+            self.loop.run_until_complete(
+                self.loop.create_task(standby.close()))
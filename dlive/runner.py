@@ -0,0 +1,211 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+
+
+class IPCChannel:
+    """The link between a bot running in a worker process and the
+    :class:`ProcessRunner` supervising it.
+
+    Messages published by one process are dispatched to every other
+    process as the ``ipc_message`` event, called with the sending
+    process id, the event name and its payload.
+
+    Attributes
+    ----------
+    process_id: :class:`int`
+        The id of the process the bot runs in
+    """
+
+    def __init__(self, process_id, outbound, inbound):
+        self.process_id = process_id
+        self._outbound = outbound
+        self._inbound = inbound
+
+    def publish(self, event: str, payload=None):
+        """Sends an event to every other process.
+
+        Parameters
+        ----------
+        event: :class:`str`
+            The events name
+        payload:
+            Any picklable data
+        """
+        self._outbound.put(("event", self.process_id, event, payload))
+
+    def _send_stats(self, stats):
+        self._outbound.put(("stats", self.process_id, None, stats))
+
+    def _listen(self, bot):
+        """Relays the inbound messages to the bot from a daemon
+        thread, so a blocked read never keeps the process alive."""
+        def relay():
+            while True:
+                try:
+                    process_id, event, payload = self._inbound.get()
+                except (EOFError, OSError):
+                    return
+
+                asyncio.run_coroutine_threadsafe(
+                    bot.shard_manager._dispatch("ipc_message", process_id, event, payload), bot.loop)
+
+        threading.Thread(target=relay, name="dlive-ipc", daemon=True).start()
+
+    async def _report(self, bot, interval):
+        while True:
+            await asyncio.sleep(interval)
+            dispatcher = bot.shard_manager.dispatcher
+            self._send_stats({
+                "pid": os.getpid(),
+                "channels": len(bot.channels),
+                "queued": len(dispatcher),
+                "dropped": dispatcher.dropped,
+                "user_cache": bot.http.user_cache.stats,
+                "shards": bot.shard_manager.health(),
+            })
+
+
+def _run_worker(bot_factory, process_id, channels, token, outbound, inbound, stats_interval):
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    bot = bot_factory(channels)
+    bot.ipc = IPCChannel(process_id, outbound, inbound)
+    bot.ipc._listen(bot)
+    if stats_interval:
+        bot.loop.create_task(bot.ipc._report(bot, stats_interval))
+
+    bot.run(token)
+
+
+class ProcessRunner:
+    """Runs a bot in several worker processes, each subscribed to
+    a share of the channels, so decoding and dispatching scale
+    across cores.
+
+    Each process builds its own bot by calling ``bot_factory`` with its
+    channels, so commands and listeners defined by the factory are the
+    same in every process. The runner restarts processes that crash.
+
+    Parameters
+    ----------
+    bot_factory:
+        Function taking a list of channels and returning a
+        :class:`~dlive.Bot` for them. It must be picklable, which
+        means defined at the top level of a module
+    channels: :class:`list`
+        Every channel to join
+    processes: Optional[:class:`int`]
+        The amount of worker processes. Defaults to the amount of CPUs,
+        but never more than there are channels
+    restart: :class:`bool`
+        Whether crashed processes are started again
+    restart_delay: :class:`float`
+        How long, in seconds, to wait before restarting a process
+    stats_interval: Optional[:class:`float`]
+        How often, in seconds, processes report their stats. ``None``
+        to never report them
+    on_stats:
+        Function called with :attr:`stats` each time a process reports
+
+    Attributes
+    ----------
+    stats: :class:`dict`
+        The last stats reported by every process, keyed by process id
+    restarts: :class:`int`
+        Amount of times a crashed process was restarted
+    """
+
+    def __init__(self, bot_factory, channels: list, *, processes: int = None, restart: bool = True,
+                 restart_delay: float = 5.0, stats_interval: float = 10.0, on_stats=None):
+        processes = processes or os.cpu_count() or 1
+        self.bot_factory = bot_factory
+        self.channels = list(channels)
+        self.processes = max(1, min(processes, len(self.channels)))
+        self.restart = restart
+        self.restart_delay = restart_delay
+        self.stats_interval = stats_interval
+        self.on_stats = on_stats
+        self.stats = {}
+        self.restarts = 0
+        self._context = multiprocessing.get_context("spawn")
+        self._outbound = self._context.Queue()
+        self._inbound = [self._context.Queue() for _ in range(self.processes)]
+        self._workers = {}
+
+    def _channels_for(self, process_id):
+        return self.channels[process_id::self.processes]
+
+    def _start(self, process_id, token):
+        worker = self._context.Process(
+            target=_run_worker,
+            args=(self.bot_factory, process_id, self._channels_for(process_id), token,
+                  self._outbound, self._inbound[process_id], self.stats_interval),
+            name=f"dlive-shard-{process_id}",
+            daemon=True)
+        worker.start()
+        self._workers[process_id] = worker
+
+    def _handle(self, message):
+        kind, process_id, event, payload = message
+
+        if kind == "stats":
+            self.stats[process_id] = payload
+            if self.on_stats is not None:
+                self.on_stats(self.stats)
+            return
+
+        for other_id, inbound in enumerate(self._inbound):
+            if other_id != process_id:
+                inbound.put((process_id, event, payload))
+
+    def _supervise(self, token):
+        crashed = {}
+        while self._workers:
+            try:
+                self._handle(self._outbound.get(timeout=0.5))
+            except queue.Empty:
+                pass
+
+            now = time.monotonic()
+            for process_id, worker in list(self._workers.items()):
+                if worker.is_alive():
+                    continue
+
+                if worker.exitcode == 0 or not self.restart:
+                    del self._workers[process_id]
+                    continue
+
+                restart_at = crashed.setdefault(process_id, now + self.restart_delay)
+                if now >= restart_at:
+                    del crashed[process_id]
+                    logging.warning(
+                        msg=f"Shard process {process_id} exited with code {worker.exitcode}, restarting it.")
+                    self.restarts += 1
+                    self._start(process_id, token)
+
+    def run(self, token=""):
+        """Main blocking call that starts every process and supervises them.
+
+        Parameters
+        ----------
+        token: Optional[:class:`str`]
+            The authorization token used to make authorized requests
+        """
+        for process_id in range(self.processes):
+            self._start(process_id, token)
+
+        try:
+            self._supervise(token)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            for worker in self._workers.values():
+                worker.terminate()
+            for worker in self._workers.values():
+                worker.join()
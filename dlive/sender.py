@@ -0,0 +1,201 @@
+import asyncio
+import time
+from collections import deque
+
+from .options import DEFAULTS
+
+MAX_MESSAGE_LENGTH = 140
+
+
+class TokenBucket:
+    """Allows ``rate`` actions per second on average, with bursts
+    of up to ``capacity`` actions.
+
+    Parameters
+    ----------
+    rate: :class:`float`
+        The amount of tokens added every second
+    capacity: :class:`float`
+        The most tokens the bucket holds
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def delay(self) -> float:
+        """Takes a token if one is available, otherwise returns
+        how long, in seconds, to wait for the next one."""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+
+        return (1 - self._tokens) / self.rate
+
+    async def acquire(self):
+        """Waits for a token and takes it."""
+        delay = self.delay()
+        while delay:
+            await asyncio.sleep(delay)
+            delay = self.delay()
+
+
+class SendQueue:
+    """Queues outgoing chat messages so they are sent at the pace
+    DLive accepts them.
+
+    Each chat has its own queue, sent in order and no faster than the
+    chat's ``chat_interval``, read again before every message so changes
+    apply right away. A global :class:`TokenBucket` caps the messages
+    sent across every chat.
+
+    With ``coalesce`` the lines waiting for the same chat are joined with
+    ``separator`` into as few messages as ``max_length`` allows.
+
+    Parameters
+    ----------
+    send:
+        Coroutine function taking the chat and the content to send
+    rate: Optional[:class:`float`]
+        The most messages sent every second across every chat.
+        ``None`` for no limit
+    coalesce: :class:`bool`
+        Whether to join the waiting lines of a chat into one message
+    max_length: :class:`int`
+        The longest message coalescing can build
+    separator: :class:`str`
+        What to join coalesced lines with
+    loop: asyncio.BaseEventLoop [Optional]
+        The asyncio event loop to use
+
+    Attributes
+    ----------
+    sent: :class:`int`
+        Amount of messages sent
+    coalesced: :class:`int`
+        Amount of lines sent as part of another message
+    """
+
+    def __init__(self, send, *, rate: float = DEFAULTS["send_rate"], coalesce: bool = DEFAULTS["send_coalesce"],
+                 max_length: int = MAX_MESSAGE_LENGTH,
+                 separator: str = " | ", loop=None):
+        self._send = send
+        self.loop = loop or asyncio.get_event_loop()
+        self.coalesce = coalesce
+        self.max_length = max_length
+        self.separator = separator
+        self.sent = 0
+        self.coalesced = 0
+        self._bucket = TokenBucket(rate, max(1.0, rate)) if rate else None
+        self._queues = {}
+        self._workers = {}
+        self._last_sent = {}
+
+    def __len__(self):
+        return sum(len(queue) for queue in self._queues.values())
+
+    def put(self, chat, content: str) -> asyncio.Future:
+        """Queues a message.
+
+        Parameters
+        ----------
+        chat: Union[:class:`~dlive.models.Chat`, :class:`str`]
+            The chat to send the message to
+        content: :class:`str`
+            The message
+
+        Returns
+        -------
+        :class:`asyncio.Future`
+            Resolves once the message is sent, or raises
+            the error DLive rejected it with
+        """
+        key = getattr(chat, "name", chat).lower()
+        future = self.loop.create_future()
+
+        try:
+            queue = self._queues[key]
+        except KeyError:
+            queue = self._queues[key] = deque()
+
+        queue.append((str(content), future))
+        if key not in self._workers:
+            self._workers[key] = self.loop.create_task(self._drain(key, chat, queue))
+
+        return future
+
+    async def _drain(self, key, chat, queue):
+        try:
+            while queue:
+                interval = getattr(chat, "chat_interval", 0) or 0
+                last_sent = self._last_sent.get(key)
+                if interval and last_sent is not None:
+                    wait = last_sent + interval - time.monotonic()
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+
+                if self._bucket is not None:
+                    await self._bucket.acquire()
+
+                content, futures = self._next_message(queue)
+                if not futures:
+                    continue
+
+                try:
+                    await self._send(chat, content)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as exc:
+                    for future in futures:
+                        if not future.done():
+                            future.set_exception(exc)
+                else:
+                    self.sent += 1
+                    for future in futures:
+                        if not future.done():
+                            future.set_result(None)
+                finally:
+                    self._last_sent[key] = time.monotonic()
+        finally:
+            del self._workers[key]
+            if not queue:
+                del self._queues[key]
+
+    def _next_message(self, queue):
+        """Pops the next message off a chat's queue, joining the lines
+        after it when coalescing. Cancelled sends are skipped."""
+        lines, futures = [], []
+        length = 0
+
+        while queue:
+            content, future = queue[0]
+            if future.cancelled():
+                queue.popleft()
+                continue
+
+            added = len(content) + (len(self.separator) if lines else 0)
+            if lines and (not self.coalesce or length + added > self.max_length):
+                break
+
+            queue.popleft()
+            lines.append(content)
+            futures.append(future)
+            length += added
+
+        self.coalesced += max(0, len(lines) - 1)
+        return self.separator.join(lines), futures
+
+    def close(self):
+        """Cancels every queued message."""
+        for task in self._workers.values():
+            task.cancel()
+
+        for queue in self._queues.values():
+            for _, future in queue:
+                future.cancel()
@@ -0,0 +1,228 @@
+import asyncio
+import bisect
+import hashlib
+import time
+
+from .decoders import DECODERS
+from .dispatcher import EventDispatcher
+from .filters import FrameFilter
+from .gateway import GatewayConnection
+from .redundant import RedundantConnection
+from .websocket import WebsocketConnection
+from .options import DEFAULTS
+
+
+class HashRing:
+    """Consistent hashing of channel names onto shards, so changing
+    the amount of shards moves as few channels as possible.
+
+    Parameters
+    ----------
+    shard_count: :class:`int`
+        The amount of shards
+    replicas: :class:`int`
+        The amount of points each shard has on the ring
+    """
+
+    def __init__(self, shard_count: int, replicas: int = 160):
+        self._ring = sorted(
+            (self._hash(f"{shard_id}:{replica}"), shard_id)
+            for shard_id in range(shard_count)
+            for replica in range(replicas))
+        self._keys = [key for key, _ in self._ring]
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], "big")
+
+    def get(self, channel: str) -> int:
+        """Returns the shard id owning ``channel``."""
+        index = bisect.bisect(self._keys, self._hash(channel.lower())) % len(self._keys)
+        return self._ring[index][1]
+
+
+class ShardManager:
+    """Spreads the bot's channels across several websocket connections.
+
+    Every shard connects, subscribes and reconnects on its own, while
+    all of them feed the same :class:`~dlive.dispatcher.EventDispatcher`,
+    so event ordering, priorities and the queue capacity are shared.
+
+    Parameters
+    ----------
+    bot: :class:`~dlive.Bot`
+        The bot owning the shards
+    shard_count: :class:`int`
+        The amount of websocket connections to open
+    shard_strategy: :class:`str`
+        ``"count"`` to spread channels evenly in the order they are
+        given, or ``"hash"`` to place them by consistent hashing
+    gateway: Optional[:class:`str`]
+        The address of a :class:`~dlive.gateway.Gateway` to receive
+        frames from instead of subscribing to DLive
+    redundant: :class:`bool`
+        Whether every shard keeps a standby websocket, see
+        :class:`~dlive.redundant.RedundantConnection`
+    loop: asyncio.BaseEventLoop [Optional]
+        The asyncio event loop to use
+    """
+
+    def __init__(self, bot, *, shard_count: int = DEFAULTS["shard_count"],
+                 shard_strategy: str = DEFAULTS["shard_strategy"], loop=None, **options):
+        if shard_count < 1:
+            raise ValueError("shard_count must be at least 1.")
+        if shard_strategy not in ("count", "hash"):
+            raise ValueError(f"Unknown shard strategy {shard_strategy!r}, expected 'count' or 'hash'.")
+
+        self._bot = bot
+        self.loop = loop or asyncio.get_event_loop()
+        self.shard_count = shard_count
+        self.shard_strategy = shard_strategy
+        self._ring = HashRing(shard_count) if shard_strategy == "hash" else None
+        self._ready = set()
+        self._readied = False
+        self._decoders = dict(DECODERS)
+        self._filters = []
+        self._dispatcher = EventDispatcher(
+            max_concurrency=options.get("max_concurrency", DEFAULTS["max_concurrency"]),
+            capacity=options.get("queue_capacity", DEFAULTS["queue_capacity"]),
+            policy=options.get("overload_policy", DEFAULTS["overload_policy"]),
+            sample_rate=options.get("sample_rate", DEFAULTS["sample_rate"]),
+            on_error=self._error,
+            on_overload=self._on_overload,
+            starvation_limit=options.get("starvation_limit", DEFAULTS["starvation_limit"]),
+            loop=self.loop)
+
+        assigned = [[] for _ in range(shard_count)]
+        for index, channel in enumerate(bot.channels):
+            assigned[self.shard_for(channel, index)].append(channel)
+
+        if options.get("gateway", DEFAULTS["gateway"]) is not None:
+            connection_cls = GatewayConnection
+        elif options.get("redundant", DEFAULTS["redundant"]):
+            connection_cls = RedundantConnection
+            options.pop("gateway", None)
+        else:
+            connection_cls = WebsocketConnection
+            options.pop("gateway", None)
+
+        self.shards = [
+            connection_cls(
+                bot, loop=self.loop, shard_id=shard_id, channels=channels,
+                dispatcher=self._dispatcher, decoders=self._decoders, filters=self._filters,
+                on_ready=self._shard_ready, **options)
+            for shard_id, channels in enumerate(assigned)]
+
+    def shard_for(self, channel: str, index: int = None) -> int:
+        """Returns the id of the shard a channel belongs to.
+
+        Parameters
+        ----------
+        channel: :class:`str`
+            The channel's name
+        index: Optional[:class:`int`]
+            The channel's position in the bot's channels, only
+            used by the ``"count"`` strategy
+        """
+        if self._ring is not None:
+            return self._ring.get(channel)
+
+        if index is None:
+            return min(range(self.shard_count), key=lambda shard_id: len(self.shards[shard_id].channels))
+
+        return index % self.shard_count
+
+    @property
+    def dispatcher(self) -> EventDispatcher:
+        """The dispatcher every shard feeds."""
+        return self._dispatcher
+
+    def health(self) -> list:
+        """Returns the state of every shard.
+
+        Returns
+        -------
+        :class:`list`
+            A :class:`dict` per shard holding its ``shard_id``, whether it
+            ``is_connected``, its ``channels``, ping ``latency``, amount of
+            ``reconnects``, the seconds ``since_last_frame`` and the measured
+            ``keepalive_interval``. Redundant
+            shards also hold their amount of ``failovers``, the
+            ``last_failover_time`` and ``duplicates_suppressed``.
+        """
+        now = time.monotonic()
+        health = []
+        for shard in self.shards:
+            state = {
+                "shard_id": shard.shard_id,
+                "is_connected": shard.is_connected,
+                "channels": list(shard.channels),
+                "latency": shard.latency,
+                "reconnects": shard.reconnects,
+                "since_last_frame": now - shard.last_frame_at if shard.last_frame_at is not None else None,
+                "keepalive_interval": shard.keepalive_interval,
+            }
+            if isinstance(shard, RedundantConnection):
+                state["failovers"] = shard.failovers
+                state["last_failover_time"] = shard.last_failover_time
+                state["duplicates_suppressed"] = shard.duplicates_suppressed
+
+            health.append(state)
+
+        return health
+
+    async def _shard_ready(self, shard):
+        self._ready.add(shard.shard_id)
+        await self._dispatch("shard_ready", shard.shard_id)
+
+        if not self._readied and len(self._ready) == self.shard_count:
+            self._readied = True
+            await self._dispatch("ready")
+
+    async def _dispatch(self, event: str, *args, **kwargs):
+        await self.shards[0]._dispatch(event, *args, **kwargs)
+
+    async def _error(self, error: Exception):
+        await self.shards[0].error(error)
+
+    def _on_overload(self, depth, dropped):
+        self.loop.create_task(self._dispatch("overload", depth, dropped))
+
+    async def _connect(self):
+        await asyncio.gather(*(shard._connect() for shard in self.shards))
+
+    async def _websocket_listen(self):
+        await asyncio.gather(*(shard._websocket_listen() for shard in self.shards))
+
+    async def join(self, channel: str):
+        """Joins a channel on the shard it belongs to, see :meth:`shard_for`."""
+        for shard in self.shards:
+            if shard._has_channel(channel.lower()):
+                return await shard.join(channel)
+
+        return await self.shards[self.shard_for(channel)].join(channel)
+
+    async def leave(self, channel: str):
+        """Leaves a channel on whichever shard joined it."""
+        for shard in self.shards:
+            if any(joined.lower() == channel.lower() for joined in shard.channels):
+                await shard.leave(channel)
+
+    def register_decoder(self, type: str, decoder, events=None):
+        self._decoders[type] = (decoder, frozenset(events) if events is not None else None)
+
+    def add_filter(self, predicate, name: str = None) -> FrameFilter:
+        frame_filter = predicate if isinstance(predicate, FrameFilter) else FrameFilter(predicate, name)
+        self._filters.append(frame_filter)
+        return frame_filter
+
+    def remove_filter(self, frame_filter: FrameFilter):
+        try:
+            self._filters.remove(frame_filter)
+        except ValueError:
+            pass
+
+    def teardown(self):
+        self._dispatcher.close()
+        for shard in self.shards:
+            shard.teardown()
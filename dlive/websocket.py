@@ -1,156 +1,538 @@
 import asyncio
-import json
+import inspect
 import logging
-import sys
-import traceback
+import time
 
 import websockets
 
-from . import errors
+from . import codec, errors
 from .backoff import ExponentialBackoff
+from .dispatcher import EventDispatcher
+from .decoders import DECODERS
+from .enums import EventPriority
+from .filters import FrameFilter
 from .models import Message
+from .options import DEFAULTS
+
+SUBSCRIPTION_QUERY = "subscription StreamMessageSubscription($streamer: String!) {streamMessageReceived(streamer: $streamer) {\n    type\n    ... on ChatGift {\n      id\n      gift\n      amount\n      recentCount\n      expireDuration\n      ...VStreamChatSenderInfoFrag\n    }\n    ... on ChatLive {\n      type}\n    ...on ChatTimeout {\n      type\n      minute\n      bannedBy {\n        id\n        username\n        displayname\n      }\n      ...VStreamChatSenderInfoFrag\n    }\n    ... on ChatOffline {\n      type}\n    ... on ChatHost {\n      id\n      viewer\n      ...VStreamChatSenderInfoFrag\n    }\n    ... on ChatSubscription {\n      id\n      month\n      ...VStreamChatSenderInfoFrag\n    }\n    ... on ChatChangeMode {\n      mode\n    }\n    ... on ChatText {\n      id\n      content\n      createdAt\n      ...VStreamChatSenderInfoFrag\n    }\n    ... on ChatFollow {\n      id\n      ...VStreamChatSenderInfoFrag\n    }\n    ... on ChatDelete {\n      ids\n    }\n    ... on ChatBan {\n      id\n      ...VStreamChatSenderInfoFrag\n    }\n    ... on ChatModerator {\n      id\n      ...VStreamChatSenderInfoFrag\n      add\n    }\n    ... on ChatEmoteAdd {\n      id\n      ...VStreamChatSenderInfoFrag\n      emote\n    }\n  }\n}\n\nfragment VStreamChatSenderInfoFrag on SenderInfo {\n  subscribing\n  role\n  roomRole\n  sender {\n    id\n    username\n    displayname\n    avatar\n    partnerStatus\n  }\n}\n"
+UNDROPPABLE_EVENTS = DEFAULTS["undroppable_events"]
+EVENT_PRIORITIES = {
+    "Ban": EventPriority.high,
+    "Timeout": EventPriority.high,
+    "Delete": EventPriority.high,
+    "Mod": EventPriority.high,
+    "ChatMode": EventPriority.high,
+    "Live": EventPriority.high,
+    "Offline": EventPriority.high,
+}
+
 
 class WebsocketConnection:
     def __init__(self, bot, *, loop: asyncio.BaseEventLoop = None, **attrs):
         self._bot = bot
         self.loop = loop or asyncio.get_event_loop()
+        self.shard_id = attrs.get("shard_id", None)
+        self.channels = attrs["channels"] if attrs.get("channels") is not None else bot.channels
+        self.reconnects = 0
+        self.last_frame_at = None
+        self.keepalive_interval = None
+        self._blocked = 0
+        self._resumed_at = None
+        self._last_keepalive_at = None
+        self._stall_timeout = attrs.get("stall_timeout", DEFAULTS["stall_timeout"])
+        self.subscriptions = {}
+        self._validated = set()
+        self._joining = {}
+        self._retries = {}
+        self._join_limit = asyncio.Semaphore(attrs.get("join_concurrency", DEFAULTS["join_concurrency"]))
         self._host = "wss://graphigostream.prd.dlive.tv"
         self._websocket = None
+        self._recv_options = {}
         self._tearingdown = False
+        self._on_ready = attrs.get("on_ready", None)
+        self._decoders = attrs["decoders"] if attrs.get("decoders") is not None else dict(DECODERS)
+        self._raw_only = attrs.get("raw_only", DEFAULTS["raw_only"])
+        self._filters = attrs["filters"] if attrs.get("filters") is not None else []
+        self._undroppable = frozenset(attrs.get("undroppable_events", DEFAULTS["undroppable_events"]))
+        self._priorities = {**EVENT_PRIORITIES, **attrs.get("event_priorities", DEFAULTS["event_priorities"])}
+        self._dispatcher = attrs["dispatcher"] if attrs.get("dispatcher") is not None else EventDispatcher(
+            max_concurrency=attrs.get("max_concurrency", DEFAULTS["max_concurrency"]),
+            capacity=attrs.get("queue_capacity", DEFAULTS["queue_capacity"]),
+            policy=attrs.get("overload_policy", DEFAULTS["overload_policy"]),
+            sample_rate=attrs.get("sample_rate", DEFAULTS["sample_rate"]),
+            on_error=self.error,
+            on_overload=self._on_overload,
+            starvation_limit=attrs.get("starvation_limit", DEFAULTS["starvation_limit"]),
+            loop=self.loop)
 
     @property
     def is_connected(self) -> bool:
         return self._websocket is not None and self._websocket.open
 
-    async def _connect(self):
+    @property
+    def latency(self):
+        """The latency of the last websocket ping, in seconds,
+        or ``None`` if it isn't known."""
+        return getattr(self._websocket, "latency", None)
+
+    async def _open_websocket(self):
         try:
-            self._websocket = await websockets.connect(self._host, timeout=30, subprotocols=["graphql-ws"])
+            websocket = await websockets.connect(self._host, timeout=30, subprotocols=["graphql-ws"])
         except Exception as exc:
             raise errors.ConnectionError(exc)
 
+        # Newer websockets versions can hand over the raw frame bytes,
+        # which the codec decodes without an intermediate str.
+        recv_parameters = inspect.signature(websocket.recv).parameters
+        self._recv_options = {"decode": False} if "decode" in recv_parameters else {}
+
+        return websocket
+
+    @property
+    def stall_timeout(self):
+        """How long, in seconds, the websocket can stay silent before it
+        is considered dead, or ``None`` if the watchdog is disabled.
+
+        Unless set with the ``stall_timeout`` option, this is three times
+        the measured keepalive interval, or a minute until it is measured.
+        """
+        if self._stall_timeout is not None:
+            return self._stall_timeout or None
+        if self.keepalive_interval is None:
+            return 60.0
+
+        return max(3 * self.keepalive_interval, 5.0)
+
+    async def _connect(self):
+        self._websocket = await self._open_websocket()
+        self.last_frame_at = time.monotonic()
+        self._last_keepalive_at = None
+
         if self.is_connected:
             self.loop.create_task(self._authenticate())
 
     async def _authenticate(self):
-        await self._websocket.send(json.dumps({
+        await self._init_websocket(self._websocket)
+        await self._join_stream_channels()
+
+    async def _init_websocket(self, websocket):
+        await websocket.send(codec.dumps({
             "type": "connection_init",
             "payload": {},
         }))
-        await self._join_stream_channels()
 
     async def _join_stream_channels(self):
-        for channel in self._bot.channels:
-            fetch_channel = await self._bot.get_chat(channel)
-            if not fetch_channel:
-                logging.warning(
-                    msg=f"{channel} is not a known channel on DLive!")
-                continue
+        # Channels validated on a previous connection are re-subscribed
+        # at once, their chats are refreshed in the background.
+        known = [channel for channel in self.channels if channel.lower() in self._validated]
+        for channel in known:
+            await self._start_channel(channel)
+            self.loop.create_task(self._bot._refresh_chat(self._bot.chats[channel.lower()]))
+
+        if known:
+            logging.info(msg=f"Re-subscribed to {len(known)} channels without validating them again.")
+
+        await asyncio.gather(*(
+            self._join_channel(channel) for channel in self.channels
+            if channel.lower() not in self._validated))
+
+        await self._ready()
+
+    async def _join_channel(self, channel):
+        """Validates a channel, at most ``join_concurrency`` at a time,
+        and subscribes to it as soon as it is validated."""
+        async with self._join_limit:
+            chat = await self._validate_channel(channel)
+
+        if chat is None:
+            return None
+
+        await self._start_channel(channel)
+        await self._dispatch("channel_joined", chat)
+        return chat
+
+    async def _start_channel(self, channel):
+        await self._subscribe(channel)
+
+    async def _stop_channel(self, channel):
+        await self._unsubscribe(channel)
+
+    async def _validate_channel(self, channel):
+        """Returns the cached chat of a channel, fetching it if it isn't
+        cached and refreshing it otherwise, or ``None`` if it doesn't exist."""
+        fetch_channel = self._bot.chats.get(channel.lower())
+        if fetch_channel is not None:
+            await self._bot._refresh_chat(fetch_channel)
+            self._validated.add(fetch_channel.name)
+            return fetch_channel
+
+        fetch_channel = await self._bot.get_chat(channel)
+        if not fetch_channel:
+            logging.warning(
+                msg=f"{channel} is not a known channel on DLive!")
+            return None
 
-            await self._websocket.send(json.dumps({
-                "id": channel,
-                "type": "start",
-                "payload": {
-                    "variables": {
-                        "streamer": f"{channel.lower()}"
-                    },
-                    "extensions": {},
-                    "operationName": "StreamMessageSubscription",
-                    "query":
-                        "subscription StreamMessageSubscription($streamer: String!) {streamMessageReceived(streamer: $streamer) {\n    type\n    ... on ChatGift {\n      id\n      gift\n      amount\n      recentCount\n      expireDuration\n      ...VStreamChatSenderInfoFrag\n    }\n    ... on ChatLive {\n      type}\n    ...on ChatTimeout {\n      type\n      ...VStreamChatSenderInfoFrag\n    }\n    ... on ChatOffline {\n      type}\n    ... on ChatHost {\n      id\n      viewer\n      ...VStreamChatSenderInfoFrag\n    }\n    ... on ChatSubscription {\n      id\n      month\n      ...VStreamChatSenderInfoFrag\n    }\n    ... on ChatChangeMode {\n      mode\n    }\n    ... on ChatText {\n      id\n      content\n      ...VStreamChatSenderInfoFrag\n    }\n    ... on ChatFollow {\n      id\n      ...VStreamChatSenderInfoFrag\n    }\n    ... on ChatDelete {\n      ids\n    }\n    ... on ChatBan {\n      id\n      ...VStreamChatSenderInfoFrag\n    }\n    ... on ChatModerator {\n      id\n      ...VStreamChatSenderInfoFrag\n      add\n    }\n    ... on ChatEmoteAdd {\n      id\n      ...VStreamChatSenderInfoFrag\n      emote\n    }\n  }\n}\n\nfragment VStreamChatSenderInfoFrag on SenderInfo {\n  subscribing\n  role\n  roomRole\n  sender {\n    id\n    username\n    displayname\n    avatar\n    partnerStatus\n  }\n}\n"
-                }
-            }))
-        await self._dispatch("ready")
+        self._bot.chats[fetch_channel.name] = fetch_channel
+        self._validated.add(fetch_channel.name)
+        return fetch_channel
+
+    async def _subscribe(self, channel, websocket=None):
+        websocket = websocket or self._websocket
+        self._subscription_states(websocket)[channel.lower()] = "pending"
+        await websocket.send(codec.dumps({
+            "id": channel.lower(),
+            "type": "start",
+            "payload": {
+                "variables": {
+                    "streamer": f"{channel.lower()}"
+                },
+                "extensions": {},
+                "operationName": "StreamMessageSubscription",
+                "query": SUBSCRIPTION_QUERY
+            }
+        }))
+
+    async def _unsubscribe(self, channel, websocket=None):
+        await (websocket or self._websocket).send(codec.dumps({
+            "id": channel.lower(),
+            "type": "stop",
+        }))
+
+    def _has_channel(self, key):
+        """Whether a channel is joined or being joined, by its lowercase name."""
+        return key in self._joining or any(joined.lower() == key for joined in self.channels)
+
+    async def join(self, channel: str):
+        """Joins a channel, subscribing to it right away if connected.
+        Concurrent joins of the same channel share one subscription."""
+        key = channel.lower()
+        if any(joined.lower() == key for joined in self.channels):
+            return self._bot.chats.get(key)
+
+        # Reserved before awaiting, so a concurrent join of the
+        # same channel in another case waits for this one.
+        try:
+            task = self._joining[key]
+        except KeyError:
+            task = self._joining[key] = self.loop.create_task(self._join(channel))
+
+        return await asyncio.shield(task)
+
+    async def _join(self, channel):
+        try:
+            if self.is_connected:
+                chat = await self._join_channel(channel)
+            else:
+                # Validated and subscribed once connected.
+                chat = await self._bot._get_cached_chat(channel)
+
+            if chat is not None:
+                self.channels.append(channel)
+
+            return chat
+        finally:
+            del self._joining[channel.lower()]
+
+    async def leave(self, channel: str):
+        """Leaves a channel, unsubscribing from it if connected."""
+        key = channel.lower()
+        kept = [joined for joined in self.channels if joined.lower() != key]
+        if len(kept) == len(self.channels):
+            return
+
+        self.channels[:] = kept
+        self._forget_subscription(key)
+        self._validated.discard(key)
+        self._bot.chats.pop(key, None)
+
+        if self.is_connected:
+            await self._stop_channel(key)
+
+    async def _ready(self):
+        if self._on_ready is not None:
+            await self._on_ready(self)
+        else:
+            await self._dispatch("ready")
 
     async def _dispatch(self, event: str, *args, **kwargs):
         try:
-            coro = getattr(self._bot, f"{event}")
-        except AttributeError:
-            pass
+            listeners = self._bot._dispatch_table[event]
+        except KeyError:
+            return
+
+        if len(listeners) == 1:
+            await self._run_listener(listeners[0], *args, **kwargs)
         else:
-            try:
-                await coro(*args, **kwargs)
-            except asyncio.CancelledError:
-                pass
+            await asyncio.gather(*(self._run_listener(listener, *args, **kwargs) for listener in listeners))
+
+    async def _run_listener(self, coro, *args, **kwargs):
+        try:
+            await coro(*args, **kwargs)
+        except asyncio.CancelledError:
+            pass
+        except Exception as exc:
+            await self.error(exc)
 
     async def error(self, error: Exception, data: str = None):
-        traceback.print_exception(
-            type(error), error, error.__traceback__, file=sys.stderr)
+        """Hands an exception raised by a listener or while processing
+        an event to :meth:`~dlive.Bot.error`, while it is being handled."""
+        await self._bot.error()
 
     async def _websocket_listen(self):
         backoff = ExponentialBackoff()
+        watchdog = self.loop.create_task(self._watchdog())
 
+        try:
+            while True:
+                try:
+                    data = codec.loads(await self._websocket.recv(**self._recv_options))
+                except websockets.ConnectionClosed:
+                    if self._tearingdown:
+                        break
+                    await self._reconnect(backoff)
+                    continue
+
+                self._frame_received(data)
+
+                if data["type"] == "connection_error":
+                    raise errors.ConnectionError(data["payload"]["message"])
+
+                self._track_subscription(data, self._websocket)
+                await self._enqueue_frame(data)
+        finally:
+            watchdog.cancel()
+
+    def _frame_received(self, data):
+        now = time.monotonic()
+        if data["type"] == "ka":
+            if self._last_keepalive_at is not None:
+                interval = now - self._last_keepalive_at
+                if self.keepalive_interval is None:
+                    self.keepalive_interval = interval
+                else:
+                    self.keepalive_interval += (interval - self.keepalive_interval) / 5
+            self._last_keepalive_at = now
+
+        self.last_frame_at = now
+
+    async def _watchdog(self):
+        """Closes the websocket once it has been silent for longer than
+        :attr:`stall_timeout`, which makes the listener reconnect. A
+        half-open connection would otherwise go unnoticed for minutes.
+
+        Frames wait in the websocket while the listener is blocked on a
+        full dispatcher, so that time doesn't count as silence."""
+        while not self._tearingdown:
+            timeout = self.stall_timeout
+            await asyncio.sleep(min(timeout / 4, 1.0) if timeout else 1.0)
+
+            if timeout is None or self.last_frame_at is None or self._blocked or not self.is_connected:
+                continue
+
+            silence = time.monotonic() - max(self.last_frame_at, self._resumed_at or 0)
+            if silence < timeout:
+                continue
+
+            logging.warning(
+                msg=f"No frame received on shard {self.shard_id} for {silence:.1f} seconds, reconnecting.")
+            self.last_frame_at = time.monotonic()
+            self.loop.create_task(self._websocket.close())
+            await self._dispatch("connection_stalled", self.shard_id, silence)
+
+    async def _reconnect(self, backoff):
+        """Reconnects right away, then backs off if that fails. The backoff
+        is reset once connected so the next drop is retried at once too."""
+        attempts = 0
         while True:
+            if attempts:
+                await asyncio.sleep(backoff.delay())
+
             try:
-                data = json.loads(await self._websocket.recv())
-            except websockets.ConnectionClosed:
-                if self._tearingdown:
-                    break
-                retry = backoff.delay()
-                await asyncio.sleep(retry)
                 await self._connect()
+            except errors.ConnectionError:
+                attempts += 1
                 continue
 
-            if data["type"] == "connection_error":
-                raise errors.ConnectionError(data["payload"]["message"])
+            break
+
+        backoff.reset()
+        self.reconnects += 1
+
+    def _subscription_states(self, websocket):
+        """The subscription state of every channel on a websocket."""
+        return self.subscriptions
+
+    def _forget_subscription(self, key):
+        self._subscription_states(self._websocket).pop(key, None)
+        for retry in [retry for retry in self._retries if retry[1] == key]:
+            del self._retries[retry]
+
+    def _track_subscription(self, data, websocket):
+        channel = data.get("id")
+        if channel is None:
+            return
+
+        key = channel.lower()
+        states = self._subscription_states(websocket)
+        if data["type"] == "data":
+            if states.get(key) != "active":
+                states[key] = "active"
+                self._retries.pop((websocket, key), None)
+
+        elif data["type"] in ("error", "complete") and key in states and not self._tearingdown:
+            logging.warning(
+                msg=f"The subscription to {channel} failed, retrying it.")
+            states[key] = "failed"
+            backoff = self._retries.setdefault((websocket, key), ExponentialBackoff())
+            self.loop.call_later(backoff.delay(), self._retry_subscription, channel, websocket)
+
+    def _retry_subscription(self, channel, websocket):
+        key = channel.lower()
+        if not websocket.open:
+            # Reconnecting subscribes on the new websocket.
+            self._retries.pop((websocket, key), None)
+        elif self._subscription_states(websocket).get(key) == "failed":
+            self.loop.create_task(self._subscribe(channel, websocket))
+
+    async def _enqueue_frame(self, data):
+        if self._filters and data["type"] == "data" and not self._filter_frame(data):
+            return
+
+        channel = data.get("id")
+        event_types = self._event_types(data)
+        droppable = data["type"] == "data" and self._undroppable.isdisjoint(event_types)
+        priority = min((self._priorities.get(event_type, EventPriority.normal) for event_type in event_types),
+                       key=lambda priority: priority.value, default=EventPriority.normal)
+
+        self._blocked += 1
+        try:
+            if not self._raw_only:
+                await self._dispatcher.submit(
+                    channel, self._process_websocket_data, data,
+                    droppable=droppable, priority=priority)
+
+            if "raw_data" in self._bot._listening:
+                await self._dispatcher.submit(
+                    channel, self._dispatch, "raw_data", data,
+                    droppable=droppable, priority=self._priorities.get("raw_data", EventPriority.low))
+        finally:
+            self._blocked -= 1
+            self._resumed_at = time.monotonic()
+
+    def _filter_frame(self, data):
+        """Runs the filters on every stream message of the frame, removing
+        the dropped ones. Returns whether any are left."""
+        try:
+            items = data["payload"]["data"]["streamMessageReceived"]
+        except (KeyError, TypeError):
+            return True
+
+        channel = data.get("id")
+        filters = self._filters
+        kept = [item for item in items if all(check(channel, item) for check in filters)]
+
+        if len(kept) != len(items):
+            data["payload"]["data"]["streamMessageReceived"] = kept
+
+        return bool(kept)
+
+    def add_filter(self, predicate, name: str = None) -> FrameFilter:
+        """Adds a filter run on every stream message before it is decoded.
+
+        Parameters
+        ----------
+        predicate:
+            Function called with the channel and the raw stream
+            message, returning whether to keep it
+        name: Optional[:class:`str`]
+            The filters name, defaults to the predicate's name
+
+        Returns
+        -------
+        :class:`~dlive.filters.FrameFilter`
+            The added filter, holding its counters
+        """
+        frame_filter = predicate if isinstance(predicate, FrameFilter) else FrameFilter(predicate, name)
+        self._filters.append(frame_filter)
+        return frame_filter
 
-            await self._process_websocket_data(data)
-            await self._dispatch("raw_data", data)
+    def remove_filter(self, frame_filter: FrameFilter):
+        """Removes a filter added with :meth:`add_filter`."""
+        try:
+            self._filters.remove(frame_filter)
+        except ValueError:
+            pass
+
+    @staticmethod
+    def _event_types(data):
+        try:
+            return {item["type"] for item in data["payload"]["data"]["streamMessageReceived"]}
+        except (KeyError, TypeError):
+            return set()
+
+    def _on_overload(self, depth, dropped):
+        self.loop.create_task(self._dispatch("overload", depth, dropped))
 
     async def _process_websocket_data(self, data):
         """Process data, check for ack, messages, etc. Remember if its a message to dispatch message."""
-        type = data["type"]
-        if type in ["connection_ack", "ka"]:
-            pass
+        if data["type"] != "data":
+            return
+
+        # Frames still queued for a channel that was left since,
+        # decoding them would fetch and cache its chat again.
+        if data["id"].lower() not in self._validated:
+            return
 
-        if type == "data":
-            data_type = data["payload"]["data"]
+        try:
+            items = data["payload"]["data"]["streamMessageReceived"]
+        except (KeyError, TypeError):
+            return
+
+        listening = self._bot._listening
+        messages = []
+        for item in items:
             try:
-                data_type["streamMessageReceived"]
-                stream_message_recieved_type = data["payload"]["data"]["streamMessageReceived"][0]["type"]
-
-                if stream_message_recieved_type == "Message":
-                    chat = await self._bot.get_chat(data["id"])
-                    author = await self._bot.get_user(data["payload"]["data"]["streamMessageReceived"][0]["sender"]["username"])
-                    return await self._dispatch("message", Message(bot=self._bot, data=data["payload"]["data"]["streamMessageReceived"][0], chat=chat, author=author))
-
-                elif stream_message_recieved_type == "Live":
-                    chat = await self._bot.http.get_chat(data["id"])
-                    return await self._dispatch("stream_start", chat)
-
-                elif stream_message_recieved_type == "Offline":
-                    chat = await self._bot.http.get_chat(data["id"])
-                    return await self._dispatch("stream_end", chat)
-
-                elif stream_message_recieved_type == "Follow":
-                    user = await self._bot.get_user(data["payload"]["data"]["streamMessageReceived"][0]["sender"]["username"])
-                    chat = await self._bot.http.get_chat(data["id"])
-                    return await self._dispatch("follow", chat, user)
-
-                elif stream_message_recieved_type == "Mod":
-                    user = await self._bot.get_user(data["payload"]["data"]["streamMessageReceived"][0]["sender"]["username"])
-                    chat = await self._bot.http.get_chat(data["id"])
-
-                    if data["payload"]["data"]["streamMessageReceived"][0]["roomRole"] == "Member":
-                        return await self._dispatch("mod_remove", chat, user)
-
-                    elif data["payload"]["data"]["streamMessageReceived"][0]["roomRole"] == "Moderator":
-                        return await self._dispatch("mod_add", chat, user)
-
-                elif stream_message_recieved_type == "Ban":
-                    user = await self._bot.get_user(data["payload"]["data"]["streamMessageReceived"][0]["sender"]["username"])
-                    chat = await self._bot.http.get_chat(data["id"])
-                    return await self._dispatch("ban", chat, user)
-
-                elif stream_message_recieved_type == "Timeout":
-                    user = await self._bot.get_user(data["payload"]["data"]["streamMessageReceived"][0]["sender"]["username"])
-                    moderator = await self._bot.get_user(data["payload"]["data"]["streamMessageReceived"][0]["bannedBy"]["username"])
-                    chat = await self._bot.http.get_chat(data["id"])
-                    return await self._dispatch("user_timeout", chat, user, moderator, data["payload"]["data"]["streamMessageReceived"][0]["minute"])
+                decoder, events = self._decoders[item["type"]]
             except KeyError:
-                pass
-        pass
+                continue
+
+            if events is not None and listening.isdisjoint(events):
+                continue
+
+            try:
+                message = await decoder(self, data["id"], item)
+            except KeyError as exc:
+                logging.warning(
+                    msg=f"Could not decode a {item['type']} stream message of {data['id']}, it has no {exc} field.")
+                continue
+
+            if isinstance(message, Message):
+                messages.append(message)
+
+        if messages and "message_batch" in listening:
+            await self._dispatch("message_batch", messages)
+
+    def register_decoder(self, type: str, decoder, events=None):
+        """Registers the decoder of a stream message type, replacing
+        the current one if there is any.
+
+        Parameters
+        ----------
+        type: :class:`str`
+            The ``type`` of the stream messages to decode
+        decoder:
+            Coroutine called with the connection, the channel and the
+            stream message. It should dispatch the matching event and
+            may return a :class:`~dlive.models.Message`
+        events: Optional[Iterable[:class:`str`]]
+            The events the decoder dispatches, it is skipped when none
+            of them have a listener. ``None`` to always run it
+        """
+        self._decoders[type] = (decoder, frozenset(events) if events is not None else None)
 
     def teardown(self):
         self._tearingdown = True
-        self.loop.run_until_complete(
-            self.loop.create_task(self._websocket.close()))
\ No newline at end of file
+        self._dispatcher.close()
+        if self._websocket is not None:
+            self.loop.run_until_complete(
+                self.loop.create_task(self._websocket.close()))
\ No newline at end of file
@@ -18,6 +18,7 @@ setup(
     long_description=long_desc,
     long_description_content_type="text/markdown",
     install_requires=["websockets", "aiohttp"],
+    extras_require={"speed": ["orjson"]},
     python_requires='>=3.5.3',
     classifiers=[
         'License :: OSI Approved :: MIT License',
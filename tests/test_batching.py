@@ -0,0 +1,105 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import dlive
+from dlive.batching import QueryBatcher
+from dlive.errors import HttpException
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+class Endpoint:
+    def __init__(self, users, error=None):
+        self.users = users
+        self.error = error
+        self.queries = []
+
+    async def send(self, json):
+        self.queries.append(json["query"])
+        if self.error is not None:
+            raise self.error
+
+        # Answers every alias of the query with the user it asks for.
+        data = {}
+        for field in json["query"][len("query{"):-1].split("} "):
+            alias, rest = field.split(": ", 1)
+            name = rest.split('"')[1]
+            data[alias] = self.users.get(name.lower())
+        return data
+
+
+def run(loop, *coroutines, **options):
+    async def gather():
+        return await asyncio.gather(*coroutines, **options)
+
+    return loop.run_until_complete(gather())
+
+
+def test_lookups_are_sent_as_one_query(loop):
+    endpoint = Endpoint({"first": {"username": "first"}, "second": {"username": "second"}})
+    batcher = QueryBatcher(endpoint.send, {"user": "username"}, loop=loop)
+
+    results = run(
+        loop,
+        batcher.load("user", "first"),
+        batcher.load("user", "Second"),
+        batcher.load("user", "missing"))
+
+    assert results == [{"username": "first"}, {"username": "second"}, None]
+    assert len(endpoint.queries) == 1
+
+
+def test_identical_lookups_share_one_alias(loop):
+    endpoint = Endpoint({"first": {"username": "first"}})
+    batcher = QueryBatcher(endpoint.send, {"user": "username"}, loop=loop)
+
+    results = run(loop, batcher.load("user", "first"), batcher.load("user", "FIRST"))
+
+    assert results == [{"username": "first"}, {"username": "first"}]
+    assert endpoint.queries[0].count("userByDisplayName") == 1
+
+
+def test_max_size_sends_a_batch_at_once(loop):
+    endpoint = Endpoint({})
+    batcher = QueryBatcher(endpoint.send, {"user": "username"}, window=60, max_size=2, loop=loop)
+
+    assert run(loop, batcher.load("user", "first"), batcher.load("user", "second")) == [None, None]
+
+
+def test_failed_queries_fail_every_lookup(loop):
+    endpoint = Endpoint({}, error=HttpException("rate limited"))
+    batcher = QueryBatcher(endpoint.send, {"user": "username"}, loop=loop)
+
+    results = run(loop, batcher.load("user", "first"), batcher.load("user", "second"), return_exceptions=True)
+
+    assert all(isinstance(result, HttpException) for result in results)
+    assert not batcher._loading
+
+
+def test_errors_without_data_are_not_cached_as_missing_users(loop):
+    bot = dlive.Bot("!", [], loop=loop)
+    loop.run_until_complete(bot.http._session.close())
+
+    class Response:
+        async def read(self):
+            return b'{"errors": [{"message": "rate limited"}], "data": null}'
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc_info):
+            pass
+
+    bot.http._session = SimpleNamespace(request=lambda **kwargs: Response())
+
+    with pytest.raises(HttpException):
+        loop.run_until_complete(bot.get_user("someone"))
+
+    assert bot.http.user_cache.get("someone") is None
@@ -0,0 +1,74 @@
+from types import SimpleNamespace
+
+from dlive.cache import UserCache
+from dlive.models.user import PartialUser
+
+
+def partial(username):
+    return PartialUser(None, {"sender": {"username": username, "displayname": username}})
+
+
+def test_users_are_looked_up_case_insensitively():
+    cache = UserCache()
+    user = SimpleNamespace(username="someone")
+    cache.put("Someone", user)
+
+    assert cache.get("SOMEONE") == (user,)
+    assert cache.get("nobody") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_missing_users_are_remembered():
+    cache = UserCache()
+    cache.put("nobody", None)
+
+    assert cache.get("nobody") == (None,)
+
+
+def test_entries_expire(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("dlive.cache.time.monotonic", lambda: now[0])
+    cache = UserCache(ttl=10, negative_ttl=1)
+    cache.put("someone", SimpleNamespace(username="someone"))
+    cache.put("nobody", None)
+
+    now[0] += 5
+    assert cache.get("someone") is not None
+    assert cache.get("nobody") is None
+
+    now[0] += 10
+    assert cache.get("someone") is None
+
+
+def test_least_recently_used_users_are_evicted():
+    cache = UserCache(maxsize=2)
+    for name in ("first", "second"):
+        cache.put(name, SimpleNamespace(username=name))
+
+    cache.get("first")
+    cache.put("third", SimpleNamespace(username="third"))
+
+    assert "first" in cache and "third" in cache
+    assert "second" not in cache
+    assert cache.evictions == 1
+
+
+def test_partial_users_only_answer_partial_lookups():
+    cache = UserCache()
+    user = partial("someone")
+    cache.warm(user)
+
+    assert cache.get("someone") is None
+    assert cache.get("someone", partial=True) == (user,)
+
+
+def test_partial_users_never_evict_full_users():
+    cache = UserCache(maxsize=1, partial_maxsize=1)
+    full = SimpleNamespace(username="full")
+    cache.put("full", full)
+    for name in ("first", "second", "third"):
+        cache.warm(partial(name))
+
+    assert cache.get("full") == (full,)
+    assert cache.get("first", partial=True) is None
+    assert cache.get("third", partial=True) is not None
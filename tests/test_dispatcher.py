@@ -0,0 +1,214 @@
+import asyncio
+
+import pytest
+
+from dlive.dispatcher import EventDispatcher, _PriorityQueue, _PrioritySemaphore
+from dlive.enums import EventPriority, OverloadPolicy
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def recorder(ran, delay=0):
+    async def record(name):
+        await asyncio.sleep(delay)
+        ran.append(name)
+
+    return record
+
+
+def test_events_of_a_channel_run_in_order(loop):
+    dispatcher = EventDispatcher(loop=loop)
+    ran = []
+
+    async def record(name, delay):
+        await asyncio.sleep(delay)
+        ran.append(name)
+
+    async def run():
+        for index in range(5):
+            await dispatcher.submit("channel", record, index, 0.01 * (5 - index))
+        await asyncio.sleep(0.3)
+
+    loop.run_until_complete(run())
+    assert ran == [0, 1, 2, 3, 4]
+
+
+def test_channels_run_concurrently(loop):
+    dispatcher = EventDispatcher(loop=loop)
+    started = []
+    release = asyncio.Event()
+
+    async def wait(name):
+        started.append(name)
+        await release.wait()
+
+    async def run():
+        await dispatcher.submit("first", wait, "first")
+        await dispatcher.submit("second", wait, "second")
+        await asyncio.sleep(0.01)
+        assert sorted(started) == ["first", "second"]
+        release.set()
+        await asyncio.sleep(0.01)
+
+    loop.run_until_complete(run())
+    assert len(dispatcher) == 0
+
+
+def test_higher_priorities_run_first_within_a_channel(loop):
+    dispatcher = EventDispatcher(loop=loop)
+    ran = []
+
+    async def run():
+        await dispatcher.submit("channel", recorder(ran), "message", priority=EventPriority.normal)
+        await dispatcher.submit("channel", recorder(ran), "raw", priority=EventPriority.low)
+        await dispatcher.submit("channel", recorder(ran), "ban", priority=EventPriority.high)
+        await asyncio.sleep(0.01)
+
+    loop.run_until_complete(run())
+    assert ran == ["ban", "message", "raw"]
+
+
+def test_lower_priorities_are_not_starved():
+    queue = _PriorityQueue(starvation_limit=2)
+    queue.append("low", EventPriority.low)
+    for index in range(4):
+        queue.append(f"high{index}", EventPriority.high)
+
+    assert [queue.popleft() for _ in range(5)] == ["high0", "high1", "low", "high2", "high3"]
+
+
+def test_semaphore_wakes_the_highest_priority_first(loop):
+    semaphore = _PrioritySemaphore(1, 16, loop)
+    woken = []
+
+    async def waiter(priority):
+        await semaphore.acquire(priority)
+        woken.append(priority)
+        semaphore.release()
+
+    async def run():
+        await semaphore.acquire(EventPriority.normal)
+        waiters = [loop.create_task(waiter(priority)) for priority in
+                   (EventPriority.low, EventPriority.normal, EventPriority.high)]
+        await asyncio.sleep(0)
+        semaphore.release()
+        await asyncio.gather(*waiters)
+
+    loop.run_until_complete(run())
+    assert woken == [EventPriority.high, EventPriority.normal, EventPriority.low]
+
+
+@pytest.mark.parametrize("policy, kept, ran", [
+    (OverloadPolicy.drop_newest, [True, True, False], ["a", "b"]),
+    (OverloadPolicy.drop_oldest, [True, True, True], ["b", "c"]),
+])
+def test_full_queue_drops_by_policy(loop, policy, kept, ran):
+    dispatcher = EventDispatcher(capacity=2, policy=policy, loop=loop)
+    done = []
+
+    async def run():
+        results = [await dispatcher.submit(name, recorder(done), name) for name in "abc"]
+        await asyncio.sleep(0.01)
+        return results
+
+    assert loop.run_until_complete(run()) == kept
+    assert sorted(done) == ran
+    assert dispatcher.dropped == 1
+
+
+def test_sample_keeps_one_in_every_sample_rate_events(loop):
+    dispatcher = EventDispatcher(capacity=1, policy=OverloadPolicy.sample, sample_rate=2, loop=loop)
+    ran = []
+
+    async def run():
+        for index in range(5):
+            await dispatcher.submit("channel", recorder(ran), index)
+        await asyncio.sleep(0.01)
+
+    loop.run_until_complete(run())
+    assert ran == [4]
+    assert dispatcher.dropped == 4
+
+
+def test_undroppable_events_make_room(loop):
+    dispatcher = EventDispatcher(capacity=2, policy=OverloadPolicy.drop_newest, loop=loop)
+    ran = []
+
+    async def run():
+        await dispatcher.submit("a", recorder(ran), "a")
+        await dispatcher.submit("b", recorder(ran), "b")
+        assert await dispatcher.submit("c", recorder(ran), "c", droppable=False)
+        await asyncio.sleep(0.01)
+
+    loop.run_until_complete(run())
+    assert sorted(ran) == ["b", "c"]
+    assert dispatcher.dropped == 1
+
+
+def test_block_waits_for_room(loop):
+    dispatcher = EventDispatcher(capacity=1, policy=OverloadPolicy.block, loop=loop)
+    release = asyncio.Event()
+    ran = []
+
+    async def wait(name):
+        await release.wait()
+        ran.append(name)
+
+    async def run():
+        await dispatcher.submit("channel", wait, "first")
+        await asyncio.sleep(0)
+        await dispatcher.submit("channel", recorder(ran), "second")
+        third = loop.create_task(dispatcher.submit("channel", recorder(ran), "third"))
+        await asyncio.sleep(0.01)
+        assert not third.done()
+
+        release.set()
+        assert await third
+        await asyncio.sleep(0.01)
+
+    loop.run_until_complete(run())
+    assert ran == ["first", "second", "third"]
+    assert dispatcher.dropped == 0
+
+
+def test_errors_are_passed_to_on_error(loop):
+    errors = []
+
+    async def on_error(exc):
+        errors.append(exc)
+
+    async def fail():
+        raise ValueError("failed")
+
+    dispatcher = EventDispatcher(on_error=on_error, loop=loop)
+
+    async def run():
+        await dispatcher.submit("channel", fail)
+        await asyncio.sleep(0.01)
+
+    loop.run_until_complete(run())
+    assert [str(exc) for exc in errors] == ["failed"]
+
+
+def test_close_cancels_workers_cleanly(loop):
+    dispatcher = EventDispatcher(loop=loop)
+
+    async def run():
+        await dispatcher.submit("channel", asyncio.sleep, 1)
+        await dispatcher.submit("channel", asyncio.sleep, 1)
+        await asyncio.sleep(0)
+        worker = dispatcher._workers["channel"]
+
+        dispatcher.close()
+        await asyncio.gather(worker, return_exceptions=True)
+        return worker
+
+    worker = loop.run_until_complete(run())
+    assert worker.cancelled()
+    assert len(dispatcher) == 0
+    assert not dispatcher._workers and not dispatcher._queues
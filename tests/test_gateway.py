@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from dlive import codec
+from dlive.gateway import Gateway
+
+
+class FakeBot:
+    def __init__(self, loop, channels):
+        self.loop = loop
+        self.channels = channels
+        self.joined = []
+        self.left = []
+        self.joining = 0
+        self.most_joining = 0
+
+    def add_listener(self, func, name):
+        pass
+
+    async def join(self, channel):
+        self.joining += 1
+        self.most_joining = max(self.most_joining, self.joining)
+        await asyncio.sleep(0.01)
+        self.joining -= 1
+        self.joined.append(channel)
+
+    async def leave(self, channel):
+        self.left.append(channel)
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def test_channels_are_joined_upstream_while_consumers_need_them(loop, tmp_path):
+    bot = FakeBot(loop, ["pinned"])
+    gateway = Gateway(bot, f"unix://{tmp_path / 'gateway.sock'}")
+
+    async def connect(channels):
+        reader, writer = await asyncio.open_unix_connection(str(tmp_path / "gateway.sock"))
+        writer.write(codec.dumps({"channels": channels}).encode() + b"\n")
+        await writer.drain()
+        return writer
+
+    async def send(writer, request):
+        writer.write(codec.dumps(request).encode() + b"\n")
+        await writer.drain()
+        await asyncio.sleep(0.05)
+
+    async def run():
+        await gateway.start()
+        first = await connect(["pinned", "shared"])
+        second = await connect([])
+        await asyncio.sleep(0.05)
+        assert bot.joined == ["shared"]
+
+        await send(second, {"join": ["Shared", "other"]})
+        assert bot.joined == ["shared", "other"]
+
+        await send(first, {"leave": ["shared"]})
+        assert bot.left == []
+
+        second.close()
+        await asyncio.sleep(0.05)
+        assert sorted(bot.left) == ["other", "shared"]
+
+        first.close()
+        await asyncio.sleep(0.05)
+        assert "pinned" not in bot.left
+
+        gateway._server.close()
+        await gateway._server.wait_closed()
+
+    loop.run_until_complete(run())
+
+
+def test_upstream_joins_run_concurrently(loop, tmp_path):
+    bot = FakeBot(loop, [])
+    gateway = Gateway(bot, f"unix://{tmp_path / 'gateway.sock'}")
+
+    async def run():
+        await gateway.start()
+        reader, writer = await asyncio.open_unix_connection(str(tmp_path / "gateway.sock"))
+        writer.write(codec.dumps({"channels": []}).encode() + b"\n")
+        for channel in ("first", "second", "third"):
+            writer.write(codec.dumps({"join": [channel]}).encode() + b"\n")
+        await writer.drain()
+        await asyncio.sleep(0.1)
+
+        writer.close()
+        await asyncio.sleep(0.05)
+        gateway._server.close()
+        await gateway._server.wait_closed()
+
+    loop.run_until_complete(run())
+    assert sorted(bot.joined) == ["first", "second", "third"]
+    assert bot.most_joining == 3
@@ -0,0 +1,85 @@
+import asyncio
+import datetime
+from types import SimpleNamespace
+
+import pytest
+
+import dlive
+from dlive.decoders import decode_delete, decode_message
+from dlive.history import MessageHistory
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def message(id, username="someone", created_at=None):
+    return SimpleNamespace(id=id, author=SimpleNamespace(username=username),
+                           created_at=created_at or datetime.datetime(2026, 1, 1))
+
+
+def test_oldest_messages_are_dropped():
+    history = MessageHistory(2)
+    for id in range(3):
+        history.append(message(id))
+
+    assert [held.id for held in history] == [1, 2]
+    assert 0 not in history
+
+
+def test_messages_are_indexed_by_author():
+    history = MessageHistory()
+    history.append(message(1, "First"))
+    history.append(message(2, "second"))
+    history.append(message(3, "first"))
+
+    assert [held.id for held in history.by_author("FIRST")] == [1, 3]
+    history.pop(1)
+    assert [held.id for held in history.by_author("first")] == [3]
+
+
+def test_since_may_be_timezone_aware():
+    history = MessageHistory()
+    history.append(message(1, created_at=datetime.datetime(2026, 1, 1, 12)))
+    paris = datetime.timezone(datetime.timedelta(hours=1))
+
+    assert len(history.by_author("someone", since=datetime.datetime(2026, 1, 1, 13, tzinfo=paris))) == 1
+    assert not history.by_author("someone", since=datetime.datetime(2026, 1, 1, 14, tzinfo=paris))
+
+
+def test_deleted_messages_are_not_added():
+    history = MessageHistory()
+    assert history.delete(1) is None
+
+    history.append(message(1))
+    assert 1 not in history
+    assert history.is_deleted(1)
+
+
+def test_messages_deleted_before_being_decoded_are_not_dispatched(loop):
+    bot = dlive.Bot("!", ["channel"], loop=loop)
+    loop.run_until_complete(bot.http._session.close())
+    chat = SimpleNamespace(name="channel", history=MessageHistory())
+    dispatched = []
+
+    async def get_cached_chat(name):
+        return chat
+
+    async def dispatch(event, *args):
+        dispatched.append((event, args))
+
+    bot._get_cached_chat = get_cached_chat
+    connection = SimpleNamespace(_bot=bot, _dispatch=dispatch)
+    item = {"type": "Message", "id": "1", "content": "hi", "createdAt": "1767225600000000000",
+            "sender": {"username": "someone", "displayname": "Someone"}}
+
+    async def run():
+        await decode_delete(connection, "channel", {"type": "Delete", "ids": ["1"]})
+        return await decode_message(connection, "channel", item)
+
+    assert loop.run_until_complete(run()) is None
+    assert [event for event, _ in dispatched] == ["message_delete"]
+    assert not chat.history
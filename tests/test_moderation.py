@@ -0,0 +1,146 @@
+import asyncio
+
+import pytest
+
+from dlive.errors import HttpException, RequiresAuthorization
+from dlive.moderation import ModerationQueue
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def mutation(name, **variables):
+    return {"operationName": name, "variables": {"streamer": "Chat", **variables}}
+
+
+def timeout(username, duration):
+    return mutation("UserTimeoutSet", username=username, duration=duration)
+
+
+class Endpoint:
+    def __init__(self, fail=None, arrays=True):
+        self.sent = []
+        self.batches = []
+        self.fail = fail
+        self.arrays = arrays
+
+    async def send(self, json):
+        await asyncio.sleep(0)
+        if self.fail is not None and json["operationName"] in self.fail:
+            raise self.fail[json["operationName"]]
+        self.sent.append(json)
+
+    async def send_batch(self, operations):
+        self.batches.append(operations)
+        if not self.arrays:
+            return None
+        if self.fail is not None and "batch" in self.fail:
+            raise self.fail["batch"]
+        return [None for _ in operations]
+
+
+def run(loop, *coroutines, **options):
+    async def gather():
+        return await asyncio.gather(*coroutines, **options)
+
+    return loop.run_until_complete(gather())
+
+
+def make_queue(loop, endpoint, **options):
+    return ModerationQueue(endpoint.send, endpoint.send_batch, loop=loop, **options)
+
+
+def test_identical_actions_are_sent_once(loop):
+    endpoint = Endpoint()
+    queue = make_queue(loop, endpoint)
+
+    run(
+        loop,
+        queue.put("ban", "Chat", "User", mutation("BanStreamChatUser", username="User")),
+        queue.put("ban", "chat", "user", mutation("BanStreamChatUser", username="user")))
+
+    assert len(endpoint.sent) == 1
+    assert queue.deduplicated == 1
+
+
+def test_newest_timeout_replaces_the_pending_one(loop):
+    endpoint = Endpoint()
+    queue = make_queue(loop, endpoint)
+
+    results = run(
+        loop,
+        queue.put("timeout", "chat", "user", timeout("user", 10)),
+        queue.put("timeout", "chat", "user", timeout("user", 0)))
+
+    assert results == [None, None]
+    assert [json["variables"]["duration"] for json in endpoint.sent] == [0]
+
+
+def test_ban_replaces_pending_deletes_and_timeouts(loop):
+    endpoint = Endpoint()
+    queue = make_queue(loop, endpoint)
+
+    run(
+        loop,
+        queue.put("delete", "chat", "user", mutation("DeleteChat", id="1")),
+        queue.put("timeout", "chat", "user", timeout("user", 10)),
+        queue.put("ban", "chat", "user", mutation("BanStreamChatUser", username="user")),
+        queue.put("delete", "chat", "user", mutation("DeleteChat", id="2")))
+
+    assert [json["operationName"] for json in endpoint.sent] == ["BanStreamChatUser"]
+    assert queue.superseded == 3
+
+
+def test_replaced_actions_fail_with_the_ban(loop):
+    endpoint = Endpoint(fail={"BanStreamChatUser": RequiresAuthorization("no token")})
+    queue = make_queue(loop, endpoint)
+
+    results = run(
+        loop,
+        queue.put("delete", "chat", "user", mutation("DeleteChat", id="1")),
+        queue.put("ban", "chat", "user", mutation("BanStreamChatUser", username="user")),
+        return_exceptions=True)
+
+    assert all(isinstance(result, RequiresAuthorization) for result in results)
+
+
+def test_bans_are_sent_first(loop):
+    endpoint = Endpoint()
+    queue = make_queue(loop, endpoint, concurrency=1)
+
+    run(
+        loop,
+        queue.put("delete", "chat", "other", mutation("DeleteChat", id="1")),
+        queue.put("timeout", "chat", "someone", timeout("someone", 10)),
+        queue.put("ban", "chat", "user", mutation("BanStreamChatUser", username="user")))
+
+    assert [json["operationName"] for json in endpoint.sent] == ["BanStreamChatUser", "UserTimeoutSet", "DeleteChat"]
+
+
+def test_batches_fall_back_to_single_requests_when_arrays_are_not_taken(loop):
+    endpoint = Endpoint(arrays=False)
+    queue = make_queue(loop, endpoint, batch=True)
+
+    run(
+        loop,
+        queue.put("delete", "chat", None, mutation("DeleteChat", id="1")),
+        queue.put("delete", "chat", None, mutation("DeleteChat", id="2")))
+
+    assert len(endpoint.batches) == 1
+    assert len(endpoint.sent) == 2
+    assert not queue.batch
+
+
+def test_failed_batches_keep_batching(loop):
+    endpoint = Endpoint(fail={"batch": HttpException("rate limited")})
+    queue = make_queue(loop, endpoint, batch=True)
+
+    with pytest.raises(HttpException):
+        loop.run_until_complete(queue.put("delete", "chat", None, mutation("DeleteChat", id="1")))
+
+    assert not endpoint.sent
+    assert queue.batch
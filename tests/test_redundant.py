@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+import websockets
+
+import dlive
+from dlive import codec
+from dlive.redundant import RecentIds, RedundantConnection
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+class FakeWebsocket:
+    def __init__(self):
+        self.frames = asyncio.Queue()
+        self.sent = []
+        self.open = True
+
+    async def recv(self, **options):
+        frame = await self.frames.get()
+        if frame is None:
+            self.open = False
+            raise websockets.ConnectionClosed(None, None)
+        return frame
+
+    async def send(self, data):
+        self.sent.append(codec.loads(data))
+
+    async def close(self):
+        self.open = False
+
+
+def frame(item, channel="channel"):
+    return codec.dumps({"id": channel, "type": "data", "payload": {"data": {"streamMessageReceived": [item]}}})
+
+
+@pytest.fixture
+def connection(loop):
+    bot = dlive.Bot("!", ["channel"], loop=loop)
+    loop.run_until_complete(bot.http._session.close())
+    connection = RedundantConnection(bot, channels=["channel"], loop=loop)
+    connection.received = []
+
+    async def enqueue_frame(data):
+        connection.received.append(data["payload"]["data"]["streamMessageReceived"][0]["type"])
+
+    connection._enqueue_frame = enqueue_frame
+    connection.primary, connection.standby = FakeWebsocket(), FakeWebsocket()
+    connection._promote(connection.primary)
+    connection._standby = connection.standby
+    return connection
+
+
+def receive(loop, connection, frames):
+    async def run():
+        readers = asyncio.gather(connection._read(connection.primary), connection._read(connection.standby))
+        for websocket, data in frames:
+            websocket.frames.put_nowait(data)
+            await asyncio.sleep(0.01)
+        readers.cancel()
+        await asyncio.gather(readers, return_exceptions=True)
+
+    loop.run_until_complete(run())
+
+
+def test_messages_with_an_id_are_deduplicated(loop, connection):
+    message = {"type": "Message", "id": "1"}
+    receive(loop, connection, [(connection.primary, frame(message)), (connection.standby, frame(message))])
+
+    assert connection.received == ["Message"]
+    assert connection.duplicates_suppressed == 1
+
+
+def test_repeated_messages_without_an_id_are_dispatched(loop, connection):
+    live, offline = {"type": "Live"}, {"type": "Offline"}
+    receive(loop, connection, [
+        (connection.primary, frame(live)), (connection.standby, frame(live)),
+        (connection.primary, frame(offline)), (connection.standby, frame(offline)),
+        (connection.primary, frame(live)), (connection.standby, frame(live)),
+    ])
+
+    assert connection.received == ["Live", "Offline", "Live"]
+    assert connection.duplicates_suppressed == 3
+
+
+def test_messages_without_an_id_are_only_paired_across_websockets(loop, connection):
+    delete = {"type": "Delete", "ids": ["1"]}
+    receive(loop, connection, [(connection.primary, frame(delete)), (connection.primary, frame(delete))])
+
+    assert connection.received == ["Delete", "Delete"]
+
+
+def test_failed_standby_subscriptions_are_retried_on_the_standby(loop, connection):
+    async def run():
+        await connection._subscribe("channel", connection.primary)
+        await connection._subscribe("channel", connection.standby)
+        connection.standby.sent.clear()
+
+        connection._track_subscription({"id": "channel", "type": "error"}, connection.standby)
+        assert connection._subscription_states(connection.standby) == {"channel": "failed"}
+        assert connection.subscriptions == {"channel": "pending"}
+
+        connection._retry_subscription("channel", connection.standby)
+        await asyncio.sleep(0)
+
+    loop.run_until_complete(run())
+    assert [data["type"] for data in connection.standby.sent] == ["start"]
+    assert not connection.primary.sent[1:]
+
+
+def test_recent_ids_are_bounded():
+    recent = RecentIds(2)
+
+    assert recent.add("first") and recent.add("second")
+    assert not recent.add("first")
+    assert recent.add("third")
+    assert "first" not in recent and len(recent) == 2
@@ -0,0 +1,69 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import dlive
+from dlive import codec
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def make_bot(loop, **options):
+    bot = dlive.Bot("!", ["first", "second", "third"], loop=loop, **options)
+    loop.run_until_complete(bot.http._session.close())
+    return bot
+
+
+def test_shards_share_the_dispatcher(loop):
+    bot = make_bot(loop, shard_count=2)
+
+    assert len(bot.shard_manager.shards) == 2
+    assert all(shard._dispatcher is bot.shard_manager.dispatcher for shard in bot.shard_manager.shards)
+
+
+def test_channels_are_spread_across_shards(loop):
+    bot = make_bot(loop, shard_count=2)
+
+    assert [shard.channels for shard in bot.shard_manager.shards] == [["first", "third"], ["second"]]
+
+
+class FakeWebsocket:
+    open = True
+
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, data):
+        self.sent.append(codec.loads(data))
+
+
+def test_joins_differing_in_case_share_one_subscription(loop):
+    bot = make_bot(loop)
+    shard = bot.shard_manager.shards[0]
+    websocket = shard._websocket = FakeWebsocket()
+
+    async def get_chat(name):
+        await asyncio.sleep(0.01)
+        return SimpleNamespace(name=name.lower())
+
+    async def refresh_chat(chat):
+        pass
+
+    bot.get_chat = get_chat
+    bot._refresh_chat = refresh_chat
+
+    async def run():
+        await asyncio.gather(bot.join("New"), bot.join("new"))
+        assert [channel.lower() for channel in shard.channels].count("new") == 1
+
+        await bot.leave("NEW")
+
+    loop.run_until_complete(run())
+    assert "new" not in [channel.lower() for channel in shard.channels + bot.channels]
+    assert [(frame["type"], frame["id"]) for frame in websocket.sent] == [("start", "new"), ("stop", "new")]